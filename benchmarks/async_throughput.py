@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Compare the throughput of the sync (WSGI) and async (ASGI) task API.
+
+The script seeds the configured database with a benchmark user and tasks,
+then for each server:
+
+    1. starts it in a subprocess (gunicorn with threads for WSGI, uvicorn
+       with ASYNC_API_VIEWS=1 for ASGI, by default);
+    2. opens `--concurrency` keep-alive connections and sends `--requests`
+       GET requests in total, spread over the list and detail endpoints;
+    3. reports requests/second, latency percentiles and errors.
+
+Usage:
+    pip install gunicorn uvicorn
+    python manage.py migrate --run-syncdb
+    python benchmarks/async_throughput.py --concurrency 500 --requests 20000
+
+The server commands can be replaced, e.g. to try the development server:
+    --wsgi-cmd "python manage.py runserver --noreload {host}:{port}"
+
+Servers whose executable is not installed are skipped.
+"""
+import argparse
+import asyncio
+import os
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SERVERS = {
+    'wsgi': (
+        'gunicorn task_manager.wsgi:application --bind {host}:{port} '
+        '--workers {workers} --threads {threads}',
+        {'ASYNC_API_VIEWS': '0'},
+    ),
+    'asgi': (
+        'uvicorn task_manager.asgi:application --host {host} --port {port} '
+        '--workers {workers} --no-access-log',
+        {'ASYNC_API_VIEWS': '1'},
+    ),
+}
+
+
+def seed(task_count):
+    """
+    Create the benchmark user and top the task table up to task_count.
+
+    Returns:
+        tuple: The token key and the ids of the seeded tasks.
+    """
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+    import django
+    django.setup()
+    from datetime import timedelta
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from rest_framework.authtoken.models import Token
+    from tasks.models import Task
+
+    user, _ = User.objects.get_or_create(username='benchmark')
+    token, _ = Token.objects.get_or_create(user=user)
+    missing = task_count - Task.objects.count()
+    if missing > 0:
+        now = timezone.now()
+        Task.objects.bulk_create([
+            Task(
+                title=f'Benchmark task {i}', description='Seeded by async_throughput',
+                status='In Progress', priority='Medium', category='Benchmark',
+                due_date=now + timedelta(minutes=i), assigned_to=user,
+            )
+            for i in range(missing)
+        ], batch_size=1000)
+    ids = list(Task.objects.order_by('id').values_list('id', flat=True)[:task_count])
+    return token.key, ids
+
+
+async def wait_for_port(host, port, timeout):
+    """Wait until the server accepts connections."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return True
+        except OSError:
+            await asyncio.sleep(0.2)
+    return False
+
+
+async def fetch(reader, writer, host, path, token):
+    """
+    Send one keep-alive GET request and read the response.
+
+    Returns:
+        tuple: The status code and whether the connection can be reused.
+    """
+    writer.write((
+        f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'
+        f'Authorization: Token {token}\r\nAccept: application/json\r\n\r\n'
+    ).encode())
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = dict(
+        (name.strip().lower(), value.strip())
+        for name, _, value in (line.partition(':') for line in lines[1:] if line)
+    )
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+        return status, headers.get('connection', '').lower() != 'close'
+    await reader.read()
+    return status, False
+
+
+async def worker(host, port, paths, token, latencies, errors):
+    """Send requests over one connection, reconnecting when it is closed."""
+    reader = writer = None
+    for path in paths:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            started = time.perf_counter()
+            status, keep_alive = await fetch(reader, writer, host, path, token)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            errors.append(type(e).__name__)
+            keep_alive = False
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(host, port, token, task_ids, concurrency, total):
+    """
+    Run the load and summarise it.
+
+    Returns:
+        dict: Throughput, latency percentiles (ms) and the error count.
+    """
+    paths = [
+        '/api/v1/tasks/?page_size=50' if i % 2 else f'/api/v1/tasks/{task_ids[i % len(task_ids)]}/'
+        for i in range(total)
+    ]
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        worker(host, port, paths[i::concurrency], token, latencies, errors)
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': quantiles[49] * 1000,
+        'p95': quantiles[94] * 1000,
+        'p99': quantiles[98] * 1000,
+        'errors': len(errors),
+    }
+
+
+def benchmark(name, command, extra_env, args, token, task_ids):
+    """Start a server, run the load against it and stop it."""
+    argv = shlex.split(command.format(
+        host=args.host, port=args.port, workers=args.workers, threads=args.threads,
+    ))
+    if shutil.which(argv[0]) is None:
+        print(f'{name}: skipped, {argv[0]} is not installed')
+        return None
+    env = {**os.environ, **extra_env, 'DJANGO_SETTINGS_MODULE': 'task_manager.settings'}
+    server = subprocess.Popen(
+        argv, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not asyncio.run(wait_for_port(args.host, args.port, args.startup_timeout)):
+            print(f'{name}: skipped, the server did not start')
+            return None
+        # One small warm-up round so imports and caches are not measured.
+        asyncio.run(run_load(args.host, args.port, token, task_ids, 4, 40))
+        return asyncio.run(run_load(
+            args.host, args.port, token, task_ids, args.concurrency, args.requests,
+        ))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--tasks', type=int, default=1000, help='Number of tasks to seed.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=1, help='Server processes.')
+    parser.add_argument('--threads', type=int, default=8, help='Threads per WSGI worker.')
+    parser.add_argument('--startup-timeout', type=float, default=15)
+    parser.add_argument('--wsgi-cmd', default=SERVERS['wsgi'][0])
+    parser.add_argument('--asgi-cmd', default=SERVERS['asgi'][0])
+    args = parser.parse_args()
+
+    token, task_ids = seed(args.tasks)
+    commands = {'wsgi': args.wsgi_cmd, 'asgi': args.asgi_cmd}
+    print(f'{args.requests} requests, concurrency {args.concurrency}, {len(task_ids)} tasks')
+    for name, (_, extra_env) in SERVERS.items():
+        result = benchmark(name, commands[name], extra_env, args, token, task_ids)
+        if result:
+            print(
+                f"{name}: {result['rps']:.0f} req/s, p50 {result['p50']:.1f} ms, "
+                f"p95 {result['p95']:.1f} ms, p99 {result['p99']:.1f} ms, "
+                f"{result['errors']} errors"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""This module defines the run_benchmarks management command."""
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks import suite
+from benchmarks.seeding import benchmark_token
+
+
+class Command(BaseCommand):
+    """
+    Run the benchmark suite and compare it with a baseline.
+    """
+    help = 'Run the task API micro-benchmarks against the seeded benchmark data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only', nargs='+', choices=sorted(suite.BENCHMARKS), default=None,
+            help='Benchmarks to run (default: all).',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Timed samples per benchmark.')
+        parser.add_argument('--number', type=int, default=10, help='Iterations per sample.')
+        parser.add_argument(
+            '--sample-size', type=int, default=100,
+            help='Tasks per serializer run and page size of the list endpoints.',
+        )
+        parser.add_argument(
+            '--list-size', type=int, default=100000,
+            help='Tasks rendered per run of the list.* benchmarks (default 100000).',
+        )
+        parser.add_argument('--output', default=None, help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', default=None, help='Compare with this JSON file.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.1,
+            help='Relative slowdown of a median counted as a regression (default 0.1).',
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Write the results to the --baseline file instead of comparing.',
+        )
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline requires --baseline.')
+        token = benchmark_token()
+        if token is None:
+            raise CommandError('No benchmark data; run seed_benchmark_data first.')
+
+        results = suite.run_suite(
+            token, names=options['only'], repeat=options['repeat'],
+            number=options['number'], sample_size=options['sample_size'],
+            list_size=options['list_size'],
+            log=self.stdout.write,
+        )
+        if options['output']:
+            suite.save(results, options['output'])
+        if options['save_baseline']:
+            suite.save(results, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Saved the baseline to {options['baseline']}."))
+            return
+        if not options['baseline']:
+            return
+
+        rows = suite.compare(results, suite.load(options['baseline']), options['threshold'])
+        regressions = [row for row in rows if row[4]]
+        for name, base, median, change, regressed in rows:
+            line = f'{name}: {base * 1000:.3f} ms -> {median * 1000:.3f} ms ({change:+.1%})'
+            self.stdout.write(self.style.ERROR(line) if regressed else line)
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} benchmarks regressed by more than {options['threshold']:.0%}."
+            )
+        self.stdout.write(self.style.SUCCESS('No regressions.'))
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""This module defines the seed_benchmark_data management command."""
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks.seeding import SCALES, seed
+
+
+class Command(BaseCommand):
+    """
+    Seed synthetic users and tasks for the benchmarks.
+    """
+    help = 'Seed synthetic benchmark users and tasks with bulk inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=sorted(SCALES), default='10k',
+            help='Number of tasks to seed.',
+        )
+        parser.add_argument(
+            '--tasks', type=int, default=None,
+            help='Exact number of tasks to seed, overriding --scale.',
+        )
+        parser.add_argument(
+            '--users', type=int, default=None,
+            help='Number of users to seed (default: one per 100 tasks, at least 10).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Rows per INSERT statement.',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+
+    def handle(self, *args, **options):
+        tasks = options['tasks'] if options['tasks'] is not None else SCALES[options['scale']]
+        if tasks < 1 or options['batch_size'] < 1:
+            raise CommandError('--tasks and --batch-size must be positive.')
+        result = seed(
+            tasks, users=options['users'], batch_size=options['batch_size'],
+            seed=options['seed'],
+            log=lambda message: self.stdout.write(message) if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {result['users']} users and {result['tasks']} tasks."
+        ))
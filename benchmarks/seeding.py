@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+This module seeds synthetic users and tasks for the benchmarks.
+
+Rows are generated lazily and written with bulk_create in batches, so
+seeding a million tasks keeps memory flat. The data is deterministic for a
+given seed. bulk_create bypasses the model signals and the task services,
+so the search index and the task counters are rebuilt afterwards.
+"""
+import random
+from datetime import timedelta
+from itertools import islice
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from tasks.counters import reconcile_counters
+from tasks.models import Task
+from tasks.search import rebuild_search_index
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+USERNAME_PREFIX = 'bench_user_'
+CATEGORIES = ['Work', 'Personal', 'Shopping', 'Health', 'Finance', 'Travel', 'Home', 'Learning']
+WORDS = (
+    'review deploy fix write plan call update prepare draft release test refactor '
+    'invoice report meeting budget backlog design migrate document schedule audit'
+).split()
+
+
+def benchmark_users():
+    """Return the queryset of the seeded benchmark users."""
+    return User.objects.filter(username__startswith=USERNAME_PREFIX)
+
+
+def benchmark_token():
+    """
+    Return the token key of the first benchmark user, or None before seeding.
+    """
+    user_id = benchmark_users().order_by('id').values_list('id', flat=True).first()
+    if user_id is None:
+        return None
+    return Token.objects.get_or_create(user_id=user_id)[0].key
+
+
+def _task_rows(count, user_ids, rng, start):
+    now = timezone.now()
+    statuses = [choice for choice, _ in Task.STATUS]
+    priorities = [choice for choice, _ in Task.PRIORITY]
+    for i in range(start, start + count):
+        words = rng.sample(WORDS, 3)
+        yield Task(
+            title=' '.join(words).capitalize() + f' #{i}',
+            description=' '.join(rng.choices(WORDS, k=rng.randint(8, 40))),
+            status=rng.choices(statuses, weights=(6, 3, 1))[0],
+            priority=rng.choice(priorities),
+            due_date=now + timedelta(minutes=rng.randint(-180 * 24 * 60, 180 * 24 * 60)),
+            category=rng.choice(CATEGORIES),
+            assigned_to_id=rng.choice(user_ids),
+        )
+
+
+def seed(tasks, users=None, batch_size=5000, seed=0, log=None):
+    """
+    Top the benchmark data up to the requested number of users and tasks.
+
+    Running it again with the same numbers writes nothing.
+
+    Parameters:
+        tasks (int): The number of benchmark tasks to have.
+        users (int, optional): The number of benchmark users to have.
+            Defaults to one per 100 tasks, at least 10.
+        batch_size (int, optional): The rows per INSERT statement.
+        seed (int, optional): The random seed.
+        log (callable, optional): Called with progress messages.
+
+    Returns:
+        dict: The number of benchmark `users` and `tasks`, and the `token`
+        key of the first benchmark user.
+    """
+    log = log or (lambda message: None)
+    users = users or max(10, tasks // 100)
+    rng = random.Random(seed)
+
+    existing_users = benchmark_users().count()
+    if existing_users < users:
+        User.objects.bulk_create(
+            User(username=f'{USERNAME_PREFIX}{i}', password='!')
+            for i in range(existing_users, users)
+        )
+        log(f'Created {users - existing_users} users.')
+    user_ids = list(benchmark_users().order_by('id').values_list('id', flat=True)[:users])
+
+    existing_tasks = Task.objects.filter(assigned_to__in=benchmark_users()).count()
+    missing = tasks - existing_tasks
+    if missing > 0:
+        rows = _task_rows(missing, user_ids, rng, existing_tasks)
+        written = 0
+        while batch := list(islice(rows, batch_size)):
+            with transaction.atomic():
+                Task.objects.bulk_create(batch, batch_size=batch_size)
+            written += len(batch)
+            log(f'Inserted {written}/{missing} tasks.')
+        log(f'Rebuilt the search index ({rebuild_search_index()} tasks).')
+        log(f'Reconciled the task counters ({reconcile_counters()} corrected).')
+    return {'users': len(user_ids), 'tasks': max(tasks, existing_tasks), 'token': benchmark_token()}
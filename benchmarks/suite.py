@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+This module defines the micro-benchmarks of the task API.
+
+Each benchmark is a function taking a BenchmarkContext and returning a
+callable that runs one iteration and returns the number of operations it
+performed. Iterations are timed with perf_counter after a warm-up, and the
+result records the median, min and max seconds per iteration and the median
+operations per second.
+
+Write benchmarks run inside a transaction that is rolled back, so the
+seeded data is left unchanged and their on-commit hooks never run.
+"""
+import gc
+import json
+import platform
+import statistics
+import time
+from datetime import timedelta
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from tasks.cache import bump_version
+from tasks.importer import import_tasks
+from tasks.models import Task
+from tasks.representation import FastJSONRenderer, get_task_plan
+from tasks.serializers import TaskSerializer
+from tasks.services import create_task, update_task
+
+BENCHMARKS = {}
+# The benchmarks that write, run in a rolled-back transaction.
+WRITE_BENCHMARKS = set()
+
+
+def benchmark(name, writes=False):
+    """Register a benchmark under a name."""
+    def register(func):
+        BENCHMARKS[name] = func
+        if writes:
+            WRITE_BENCHMARKS.add(name)
+        return func
+    return register
+
+
+def get_host():
+    """
+    Return a host name accepted by ALLOWED_HOSTS for the test client.
+    """
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+class BenchmarkContext:
+    """
+    The data and client shared by the benchmarks.
+
+    Parameters:
+        token (str): The token of the benchmark user.
+        sample_size (int): The number of tasks loaded for the serializer
+            benchmarks and used as page size.
+        list_size (int): The number of tasks rendered by the list
+            benchmarks.
+    """
+
+    def __init__(self, token, sample_size, list_size):
+        self.client = Client(HTTP_HOST=get_host(), HTTP_AUTHORIZATION=f'Token {token}')
+        self.client_user_id = Token.objects.get(key=token).user_id
+        self.sample_size = sample_size
+        self.list_size = list_size
+        self.task = Task.objects.order_by('id').first()
+        self.user_id = self.task.assigned_to_id
+
+    def get(self, path, uncached=True):
+        """
+        GET a path through the test client, bypassing the response cache.
+
+        Returns:
+            int: 1, the number of requests sent.
+        """
+        if uncached:
+            bump_version([self.client_user_id])
+        response = self.client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {path} returned {response.status_code}')
+        return 1
+
+
+@benchmark('serializer.task_many')
+def serializer_many(context):
+    tasks = list(Task.objects.order_by('id')[:context.sample_size])
+
+    def run():
+        TaskSerializer(tasks, many=True).data
+        return len(tasks)
+    return run
+
+
+@benchmark('list.model_serializer')
+def list_model_serializer(context):
+    queryset = Task.objects.order_by('due_date', 'id')[:context.list_size]
+
+    def run():
+        data = TaskSerializer(queryset, many=True).data
+        JSONRenderer().render(data)
+        return len(data)
+    return run
+
+
+@benchmark('list.row_plan')
+def list_row_plan(context):
+    queryset = Task.objects.order_by('due_date', 'id')[:context.list_size]
+    plan = get_task_plan()
+
+    def run():
+        data = plan.serialize(queryset)
+        FastJSONRenderer().render(data)
+        return len(data)
+    return run
+
+
+@benchmark('serializer.task_validate')
+def serializer_validate(context):
+    data = {
+        'title': 'Benchmark', 'description': 'Validated by the benchmark',
+        'status': 'In Progress', 'priority': 'High',
+        'due_date': (timezone.now() + timedelta(days=1)).isoformat(),
+        'category': 'Work', 'assigned_to': context.user_id,
+    }
+
+    def run():
+        TaskSerializer(data=data).is_valid(raise_exception=True)
+        return 1
+    return run
+
+
+@benchmark('endpoint.list_page')
+def list_page(context):
+    path = f'/api/v1/tasks/?page_size={context.sample_size}'
+    return lambda: context.get(path)
+
+
+@benchmark('endpoint.list_board')
+def list_board(context):
+    path = f'/api/v1/tasks/?view=board&page_size={context.sample_size}'
+    return lambda: context.get(path)
+
+
+@benchmark('endpoint.list_mine')
+def list_mine(context):
+    path = f'/api/v1/tasks/?scope=mine&page_size={context.sample_size}'
+    return lambda: context.get(path)
+
+
+@benchmark('endpoint.list_page_cached')
+def list_page_cached(context):
+    path = f'/api/v1/tasks/?page_size={context.sample_size}'
+    return lambda: context.get(path, uncached=False)
+
+
+@benchmark('endpoint.list_filtered')
+def list_filtered(context):
+    path = f'/api/v1/tasks/?status=In+Progress&priority=High&page_size={context.sample_size}'
+    return lambda: context.get(path)
+
+
+@benchmark('endpoint.status')
+def status_page(context):
+    path = f'/api/v1/tasks/status/Overdue/?page_size={context.sample_size}'
+    return lambda: context.get(path)
+
+
+@benchmark('endpoint.detail')
+def detail(context):
+    path = f'/api/v1/tasks/{context.task.id}/'
+    return lambda: context.get(path)
+
+
+@benchmark('services.create_task', writes=True)
+def services_create(context):
+    data = {
+        'title': 'Benchmark', 'description': 'Created by the benchmark',
+        'status': 'In Progress', 'priority': 'High',
+        'due_date': (timezone.now() + timedelta(days=1)).isoformat(),
+        'category': 'Work', 'assigned_to': context.user_id,
+    }
+
+    def run():
+        create_task(data)
+        return 1
+    return run
+
+
+@benchmark('services.update_task', writes=True)
+def services_update(context):
+    statuses = ['Completed', 'In Progress']
+
+    def run():
+        statuses.reverse()
+        update_task(context.task, {'status': statuses[0]})
+        return 1
+    return run
+
+
+@benchmark('importer.import_tasks', writes=True)
+def importer_import(context):
+    due_date = (timezone.now() + timedelta(days=1)).isoformat()
+    rows = [
+        (number, {
+            'title': f'Imported {number}', 'description': 'Imported by the benchmark',
+            'status': 'In Progress', 'priority': 'High', 'due_date': due_date,
+            'category': 'Work', 'assigned_to': str(context.user_id),
+        })
+        for number in range(1, context.sample_size * 10 + 1)
+    ]
+
+    def run():
+        return import_tasks(rows)['imported']
+    return run
+
+
+def time_benchmark(run, repeat, number, warmup=1):
+    """
+    Time a benchmark.
+
+    Parameters:
+        run (callable): Runs one iteration and returns its operation count.
+        repeat (int): The number of timed samples.
+        number (int): The iterations per sample.
+        warmup (int, optional): Untimed iterations run first.
+
+    Returns:
+        dict: The median, min and max seconds per iteration, the median
+        operations per second and the samples.
+    """
+    for _ in range(warmup):
+        run()
+    samples, ops = [], 0
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            ops = sum(run() for _ in range(number))
+            samples.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    median = statistics.median(samples)
+    return {
+        'median': median,
+        'min': min(samples),
+        'max': max(samples),
+        'ops_per_sec': (ops / number) / median if median else 0.0,
+        'samples': samples,
+    }
+
+
+def run_suite(token, names=None, repeat=5, number=10, sample_size=100, list_size=100000, log=None):
+    """
+    Run the registered benchmarks.
+
+    Parameters:
+        token (str): The token of the benchmark user.
+        names (list, optional): The benchmarks to run; all by default.
+        repeat (int, optional): The number of timed samples per benchmark.
+        number (int, optional): The iterations per sample.
+        sample_size (int, optional): The tasks per serializer run and page.
+        list_size (int, optional): The tasks per list rendering run.
+        log (callable, optional): Called with progress messages.
+
+    Returns:
+        dict: The `meta` data of the run and the `results` by benchmark.
+    """
+    log = log or (lambda message: None)
+    context = BenchmarkContext(token, sample_size, list_size)
+    results = {}
+    for name in names or BENCHMARKS:
+        if name in WRITE_BENCHMARKS:
+            with transaction.atomic():
+                results[name] = time_benchmark(BENCHMARKS[name](context), repeat, number)
+                transaction.set_rollback(True)
+            context.task.refresh_from_db()
+        else:
+            results[name] = time_benchmark(BENCHMARKS[name](context), repeat, number)
+        log(f"{name}: {results[name]['median'] * 1000:.3f} ms, "
+            f"{results[name]['ops_per_sec']:.0f} ops/s")
+    return {
+        'meta': {
+            'timestamp': timezone.now().isoformat(),
+            'tasks': Task.objects.count(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'repeat': repeat,
+            'number': number,
+            'sample_size': sample_size,
+            'list_size': list_size,
+        },
+        'results': results,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare a run with a baseline run.
+
+    Parameters:
+        results (dict): The run, as returned by run_suite.
+        baseline (dict): The baseline run.
+        threshold (float): The relative slowdown of the median considered a
+            regression, e.g. 0.1 for 10%.
+
+    Returns:
+        list: (name, baseline median, median, relative change, regressed)
+        tuples for the benchmarks present in both runs.
+    """
+    rows = []
+    for name, result in results['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        change = result['median'] / base['median'] - 1 if base['median'] else 0.0
+        rows.append((name, base['median'], result['median'], change, change > threshold))
+    return rows
+
+
+def load(path):
+    """Load a saved run."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results, path):
+    """Save a run as JSON."""
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""This module defines the BenchmarkTests class."""
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework.test import APITestCase
+from tasks.models import Task, TaskCounter
+from . import suite
+from .seeding import benchmark_users
+
+
+class BenchmarkTests(APITestCase):
+    """
+    Smoke tests of the benchmark seeding and runner.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_seed_is_deterministic_and_idempotent(self):
+        call_command('seed_benchmark_data', tasks=50, users=5, batch_size=20, stdout=StringIO())
+        self.assertEqual(benchmark_users().count(), 5)
+        self.assertEqual(Task.objects.count(), 50)
+        titles = list(Task.objects.order_by('id').values_list('title', flat=True))
+        counted = sum(TaskCounter.objects.filter(scope='all', field='status').values_list('count', flat=True))
+        self.assertEqual(counted, 50)
+
+        call_command('seed_benchmark_data', tasks=50, users=5, stdout=StringIO())
+        self.assertEqual(Task.objects.count(), 50)
+        Task.objects.all().delete()
+        call_command('seed_benchmark_data', tasks=50, users=5, batch_size=7, stdout=StringIO())
+        self.assertEqual(list(Task.objects.order_by('id').values_list('title', flat=True)), titles)
+
+    def test_run_benchmarks_and_compare(self):
+        with self.assertRaises(CommandError):
+            call_command('run_benchmarks', stdout=StringIO())
+        call_command('seed_benchmark_data', tasks=30, users=3, stdout=StringIO())
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = Path(directory) / 'baseline.json'
+            call_command(
+                'run_benchmarks', repeat=1, number=1, sample_size=10, list_size=20,
+                baseline=str(baseline), save_baseline=True, stdout=StringIO(),
+            )
+            saved = json.loads(baseline.read_text())
+            self.assertEqual(set(saved['results']), set(suite.BENCHMARKS))
+            # The list benchmarks count the tasks they render.
+            for name in ('list.model_serializer', 'list.row_plan'):
+                result = saved['results'][name]
+                self.assertAlmostEqual(result['ops_per_sec'] * result['median'], 20)
+            self.assertEqual(saved['meta']['tasks'], 30)
+            # The write benchmarks are rolled back.
+            self.assertEqual(Task.objects.count(), 30)
+
+            for result in saved['results'].values():
+                result['median'] /= 100
+            baseline.write_text(json.dumps(saved))
+            with self.assertRaises(CommandError):
+                call_command(
+                    'run_benchmarks', repeat=1, number=1, sample_size=10,
+                    only=['serializer.task_many'], baseline=str(baseline), stdout=StringIO(),
+                )
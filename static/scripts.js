@@ -136,63 +136,122 @@ $(document).ready(function () {
     };
     
 
+    const TASK_PAGE_SIZE = 100;
+    let loadGeneration = 0;
+
+    /**
+     * Builds the card markup for a single task.
+     *
+     * @param {Object} task - The task to render.
+     * @return {string} The HTML of the task card.
+     */
+    const buildTaskCard = (task) => {
+        const priorityColor = getPriorityColor(task.priority);
+        const formattedDueDate = formatDueDate(task.due_date);
+        const categoryColor = `hsl(${Math.random() * 360}, 100%, 30%)`;
+
+        // Generate avatars for the task card based on assigned users
+        const assignedUser = usersData.find(user => user.id === task.assigned_to);
+        const initials = assignedUser ? assignedUser.username.slice(0, 2).toUpperCase() : 'NA';
+        const userAvatar = `<img src="https://ui-avatars.com/api/?name=${initials}&background=random" alt="Avatar" class="w-8 h-8 rounded-full border-2 border-white">`;
+
+        return `
+            <div class="task-card" data-id="${task.id}">
+            <div class="mb-1 p-2 flex justify-between">
+                <span class="inline-flex flex-grow bg-gray-50 shadow-md py-2 px-4 justify-center items-center text-sm" style="color: ${priorityColor};">${task.priority}</span>
+                <span class="inline-flex flex-grow bg-gray-50 shadow-md mx-4 py-2 px-4 justify-center items-center text-blue-500 text-sm">${formattedDueDate}</span>
+                <span class="inline-flex flex-grow bg-gray-50 shadow-md py-2 px-4 justify-center items-center text-sm" style="color: ${categoryColor};">${task.category}</span>
+            </div>
+            <div class="bg-gray-50 pt-2 pb-2 px-6 py-12 rounded shadow-md" data-id="${task.id}">
+                <h3 class="text-xl font-semibold">${task.title}</h3>
+                <p class="truncate">${task.description}</p>
+                <div class="flex justify-between items-center mt-4">
+                    <div class="flex -space-x-2">${userAvatar}</div>
+                    <div class="flex space-x-2">
+                        <button class="preview-task text-black hover:text-blue-500" data-id="${task.id}"><i class="fas fa-eye"></i></button>
+                        <button class="delete-task text-black hover:text-blue-500" data-id="${task.id}"><i class="fas fa-trash-alt"></i></button>
+                        <button class="edit-task text-black hover:text-blue-500" data-id="${task.id}"><i class="fas fa-edit"></i></button>
+                    </div>
+                </div>
+            </div>
+            </div>
+        `;
+    };
+
+    /**
+     * Appends task cards to the column matching each task's status.
+     *
+     * @param {Array<Object>} tasks - The tasks to append.
+     * @return {void}
+     */
+    const appendTasks = (tasks) => {
+        tasks.forEach(task => {
+            const taskCard = buildTaskCard(task);
+
+            if (task.status === 'In Progress') {
+                $('#in-progress-tasks').append(taskCard);
+            } else if (task.status === 'Completed') {
+                $('#completed-tasks').append(taskCard);
+            } else if (task.status === 'Overdue') {
+                $('#over-due-tasks').append(taskCard);
+            }
+        });
+    };
+
     /**
-     * Asynchronously loads tasks from the server and populates the task cards based on their status.
+     * Asynchronously loads tasks from the server page by page and populates the
+     * task cards based on their status as each page arrives.
      */
     const loadTasks = async () => {
-        try {
-            const response = await $.ajax({
-                url: '/api/v1/tasks/',
-                method: 'GET',
-            });
+        const generation = ++loadGeneration;
+        let url = `/api/v1/tasks/?view=board&page_size=${TASK_PAGE_SIZE}`;
+
+        loadTaskCounts();
 
+        try {
             $('#in-progress-tasks, #completed-tasks, #over-due-tasks').empty();
 
-            response.forEach(task => {
-                const priorityColor = getPriorityColor(task.priority);
-                const formattedDueDate = formatDueDate(task.due_date);
-                const categoryColor = `hsl(${Math.random() * 360}, 100%, 30%)`;
-
-                // Generate avatars for the task card based on assigned users
-                const assignedUser = usersData.find(user => user.id === task.assigned_to);
-                const initials = assignedUser ? assignedUser.username.slice(0, 2).toUpperCase() : 'NA';
-                const userAvatar = `<img src="https://ui-avatars.com/api/?name=${initials}&background=random" alt="Avatar" class="w-8 h-8 rounded-full border-2 border-white">`;
-
-                const taskCard = `
-                    <div class="mb-1 p-2 flex justify-between">
-                        <span class="inline-flex flex-grow bg-gray-50 shadow-md py-2 px-4 justify-center items-center text-sm" style="color: ${priorityColor};">${task.priority}</span>
-                        <span class="inline-flex flex-grow bg-gray-50 shadow-md mx-4 py-2 px-4 justify-center items-center text-blue-500 text-sm">${formattedDueDate}</span>
-                        <span class="inline-flex flex-grow bg-gray-50 shadow-md py-2 px-4 justify-center items-center text-sm" style="color: ${categoryColor};">${task.category}</span>
-                    </div>
-                    <div class="bg-gray-50 pt-2 pb-2 px-6 py-12 rounded shadow-md" data-id="${task.id}">
-                        <h3 class="text-xl font-semibold">${task.title}</h3>
-                        <p class="truncate">${task.description}</p>
-                        <div class="flex justify-between items-center mt-4">
-                            <div class="flex -space-x-2">${userAvatar}</div>
-                            <div class="flex space-x-2">
-                                <button class="preview-task text-black hover:text-blue-500" data-id="${task.id}"><i class="fas fa-eye"></i></button>
-                                <button class="delete-task text-black hover:text-blue-500" data-id="${task.id}"><i class="fas fa-trash-alt"></i></button>
-                                <button class="edit-task text-black hover:text-blue-500" data-id="${task.id}"><i class="fas fa-edit"></i></button>
-                            </div>
-                        </div>
-                    </div>
-                `;
-
-                if (task.status === 'In Progress') {
-                    $('#in-progress-tasks').append(taskCard);
-                } else if (task.status === 'Completed') {
-                    $('#completed-tasks').append(taskCard);
-                } else if (task.status === 'Overdue') {
-                    $('#over-due-tasks').append(taskCard);
+            while (url) {
+                const page = await $.ajax({
+                    url: url,
+                    method: 'GET',
+                });
+
+                // A newer load has started; drop this one's remaining pages.
+                if (generation !== loadGeneration) {
+                    return;
                 }
-            });
 
-            updateTaskCounts(response);
+                appendTasks(page.results);
+                url = page.next;
+            }
         } catch (error) {
             console.error('Failed to load tasks:', error);
         }
     };
 
+    /**
+     * Loads the board column counts from the stats endpoint instead of
+     * counting downloaded tasks.
+     *
+     * @return {Promise<void>} A promise that resolves when the counts are updated.
+     */
+    const loadTaskCounts = async () => {
+        try {
+            const stats = await $.ajax({
+                url: '/api/v1/tasks/stats/',
+                method: 'GET',
+                data: { scope: 'all' },
+            });
+
+            updateTaskCount('in-progress-title', stats.status['In Progress']);
+            updateTaskCount('completed-title', stats.status['Completed']);
+            updateTaskCount('over-due-title', stats.status['Overdue']);
+        } catch (error) {
+            console.error('Failed to load task counts:', error);
+        }
+    };
+
     /**
      * Returns the corresponding color for a given priority.
      *
@@ -330,7 +389,7 @@ $(document).ready(function () {
                 });
             }
             closeModal();
-            loadTasks();
+            refreshAfterWrite();
         } catch (error) {
             console.error(`Failed to ${taskId ? 'update' : 'create'} task:`, error);
         }
@@ -354,19 +413,30 @@ $(document).ready(function () {
         }
     });
 
-    $('#search').on('keyup', async function () {
-        const query = $(this).val();
+    let searchTimer = null;
 
-        try {
-            const data = await $.ajax({
-                url: '/api/v1/tasks/',
-                method: 'GET',
-                data: { search: query },
-            });
-            populateTasks(data);
-        } catch (error) {
-            console.error('Failed to search tasks:', error);
-        }
+    $('#search').on('keyup', function () {
+        const query = $(this).val().trim();
+
+        // Wait for the user to pause typing before querying the search index.
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(async () => {
+            if (!query) {
+                loadTasks();
+                return;
+            }
+
+            try {
+                const data = await $.ajax({
+                    url: '/api/v1/tasks/search/',
+                    method: 'GET',
+                    data: { q: query },
+                });
+                populateTasks(data);
+            } catch (error) {
+                console.error('Failed to search tasks:', error);
+            }
+        }, 250);
     });
 
     /**
@@ -376,48 +446,10 @@ $(document).ready(function () {
      * @return {void} This function does not return anything.
      */
     const populateTasks = (tasks) => {
+        // Invalidate any paged load still in flight so it does not append to the filtered view.
+        loadGeneration++;
         $('#in-progress-tasks, #completed-tasks, #over-due-tasks').empty();
-
-        tasks.forEach(task => {
-            const priorityColor = getPriorityColor(task.priority);
-            const formattedDueDate = formatDueDate(task.due_date);
-            const categoryColor = `hsl(${Math.random() * 360}, 100%, 30%)`;
-
-            // Generate avatars for the task card based on assigned users
-            const assignedUser = usersData.find(user => user.id === task.assigned_to);
-            const initials = assignedUser ? assignedUser.username.slice(0, 2).toUpperCase() : 'NA';
-            const userAvatar = `<img src="https://ui-avatars.com/api/?name=${initials}&background=random" alt="Avatar" class="w-8 h-8 rounded-full border-2 border-white">`;
-
-
-            const taskCard = `
-                <div class="p-2 flex justify-between">
-                    <span class="inline-flex flex-grow bg-gray-50 shadow-md py-2 px-4 justify-center items-center text-sm" style="color: ${priorityColor};">${task.priority}</span>
-                    <span class="inline-flex flex-grow bg-gray-50 shadow-md mx-4 py-2 px-4 justify-center items-center text-blue-500 text-sm">${formattedDueDate}</span>
-                    <span class="inline-flex flex-grow bg-gray-50 shadow-md py-2 px-4 justify-center items-center text-sm" style="color: ${categoryColor};">${task.category}</span>
-                </div>
-                <div class="bg-gray-50 p-4 rounded shadow-md" data-id="${task.id}">
-                    <h3 class="text-xl font-semibold">${task.title}</h3>
-                    <p class="truncate">${task.description}</p>
-                    <div class="flex justify-between items-center mt-4">
-                        <div class="flex -space-x-2">${userAvatar}</div>
-                        <div class="flex space-x-2">
-                            <button class="preview-task text-black hover:text-blue-500" data-id="${task.id}"><i class="fas fa-eye"></i></button>
-                            <button class="delete-task text-black hover:text-blue-500" data-id="${task.id}"><i class="fas fa-trash-alt"></i></button>
-                            <button class="edit-task text-black hover:text-blue-500" data-id="${task.id}"><i class="fas fa-edit"></i></button>
-                        </div>
-                    </div>
-                </div>
-            `;
-
-            if (task.status === 'In Progress') {
-                $('#in-progress-tasks').append(taskCard);
-            } else if (task.status === 'Completed') {
-                $('#completed-tasks').append(taskCard);
-            } else if (task.status === 'Overdue') {
-                $('#over-due-tasks').append(taskCard);
-            }
-        });
-
+        appendTasks(tasks);
         updateTaskCounts(tasks);
     };
 
@@ -431,7 +463,7 @@ $(document).ready(function () {
                     url: `/api/v1/tasks/${taskId}/`,
                     method: 'DELETE',
                 });
-                loadTasks();
+                refreshAfterWrite();
             } catch (error) {
                 console.error('Failed to delete task:', error);
             }
@@ -548,12 +580,66 @@ $(document).ready(function () {
                 contentType: 'application/json',
                 data: JSON.stringify({ status: newStatus }),
             });
-            loadTasks();
+            refreshAfterWrite();
         } catch (error) {
             console.error('Failed to update task status:', error);
         }
     };
 
+    let taskEvents = null;
+
+    /**
+     * Removes the card of a task from the board.
+     *
+     * @param {number} taskId - The ID of the task.
+     * @return {void}
+     */
+    const removeTaskCard = (taskId) => {
+        $(`.task-card[data-id="${taskId}"]`).remove();
+    };
+
+    /**
+     * Subscribes to the task change feed and patches single cards as other
+     * users create, update or delete tasks, instead of reloading the board.
+     *
+     * @return {void}
+     */
+    const subscribeToTaskEvents = () => {
+        if (!window.EventSource) {
+            return;
+        }
+
+        taskEvents = new EventSource('/api/v1/tasks/events/');
+
+        const placeTaskCard = (event) => {
+            const { task } = JSON.parse(event.data);
+            removeTaskCard(task.id);
+            appendTasks([task]);
+            loadTaskCounts();
+        };
+
+        taskEvents.addEventListener('created', placeTaskCard);
+        taskEvents.addEventListener('updated', placeTaskCard);
+        taskEvents.addEventListener('deleted', (event) => {
+            removeTaskCard(JSON.parse(event.data).id);
+            loadTaskCounts();
+        });
+        taskEvents.addEventListener('reload', () => loadTasks());
+    };
+
+    /**
+     * Refreshes the board after a write made from this page. When the change
+     * feed is connected the write comes back as an event, so nothing is fetched.
+     *
+     * @return {void}
+     */
+    const refreshAfterWrite = () => {
+        if (!taskEvents || taskEvents.readyState !== EventSource.OPEN) {
+            loadTasks();
+        }
+    };
+
     fetchUsers();
     loadTasks();
+    subscribeToTaskEvents();
 });
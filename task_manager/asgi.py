@@ -2,6 +2,8 @@
 ASGI config for task_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn task_manager.asgi:application``)
+to enable the asynchronous task change feed at ``/api/v1/tasks/events/``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
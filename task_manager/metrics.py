@@ -0,0 +1,345 @@
+"""
+Request instrumentation for task_manager.
+
+metrics_middleware records, for every request and labelled by the resolved
+route name (e.g. `tasks:task-list`) and method:
+
+    http_requests_total              requests, also by status code
+    http_request_duration_seconds    latency histogram
+    http_request_db_queries          histogram of queries per request
+    db_query_duration_seconds_total  time spent in the database
+    serializer_duration_seconds_total time spent serializing (see
+                                     track_serializer_time)
+    http_response_bytes              histogram of response body sizes
+
+Queries are counted by a wrapper installed on every database connection
+(connection.execute_wrapper) that reports to the current request through a
+context variable, so queries run from async views in worker threads are
+counted too. A request running the same SQL statement at least
+METRICS_N_PLUS_ONE_THRESHOLD times is logged as a likely N+1 pattern.
+
+Metrics live in the memory of each worker process and are exposed in the
+Prometheus text format by metrics_view at /metrics, to scrapers sending the
+METRICS_TOKEN bearer token.
+"""
+import hmac
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+UNMATCHED_ROUTE = 'unmatched'
+
+# The RequestStats of the request being served, if any.
+current_stats = ContextVar('current_stats', default=None)
+
+
+class Metric:
+    """
+    A labelled Prometheus metric.
+
+    Parameters:
+        name (str): The metric name.
+        help_text (str): The HELP line.
+        labels (tuple): The label names.
+    """
+    type = None
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _format_labels(self, values, extra=()):
+        pairs = list(zip(self.labels, values)) + list(extra)
+        escaped = (
+            (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for name, value in pairs
+        )
+        return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+    def expose(self):
+        """
+        Render the metric in the Prometheus text format.
+
+        Returns:
+            list: The lines of the metric.
+        """
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.type}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.extend(self._sample_lines(labels, value))
+        return lines
+
+
+class MetricCounter(Metric):
+    """A monotonically increasing Prometheus counter."""
+    type = 'counter'
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _sample_lines(self, labels, value):
+        return [f'{self.name}{self._format_labels(labels)} {value}']
+
+
+class Histogram(Metric):
+    """
+    A Prometheus histogram.
+
+    Parameters:
+        buckets (tuple): The upper bounds of the buckets.
+    """
+    type = 'histogram'
+
+    def __init__(self, name, help_text, labels, buckets):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+
+    def observe(self, labels, value):
+        with self._lock:
+            counts, total, count = self._values.get(labels, ([0] * len(self.buckets), 0, 0))
+            counts = [n + (value <= bound) for n, bound in zip(counts, self.buckets)]
+            self._values[labels] = (counts, total + value, count + 1)
+
+    def _sample_lines(self, labels, value):
+        counts, total, count = value
+        lines = [
+            f'{self.name}_bucket{self._format_labels(labels, [("le", bound)])} {n}'
+            for bound, n in zip(self.buckets, counts)
+        ]
+        lines.append(f'{self.name}_bucket{self._format_labels(labels, [("le", "+Inf")])} {count}')
+        lines.append(f'{self.name}_sum{self._format_labels(labels)} {total}')
+        lines.append(f'{self.name}_count{self._format_labels(labels)} {count}')
+        return lines
+
+
+ROUTE_LABELS = ('route', 'method')
+
+REQUESTS = MetricCounter('http_requests_total', 'Requests served.', ROUTE_LABELS + ('status',))
+LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency.', ROUTE_LABELS, LATENCY_BUCKETS,
+)
+QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request.', ROUTE_LABELS, QUERY_BUCKETS,
+)
+QUERY_TIME = MetricCounter(
+    'db_query_duration_seconds_total', 'Time spent running database queries.', ROUTE_LABELS,
+)
+SERIALIZER_TIME = MetricCounter(
+    'serializer_duration_seconds_total', 'Time spent serializing response data.', ROUTE_LABELS,
+)
+RESPONSE_BYTES = Histogram(
+    'http_response_bytes', 'Response body sizes.', ROUTE_LABELS, BYTES_BUCKETS,
+)
+REPEATED_QUERIES = MetricCounter(
+    'db_repeated_query_requests_total',
+    'Requests running one SQL statement at least METRICS_N_PLUS_ONE_THRESHOLD times.',
+    ROUTE_LABELS,
+)
+
+REGISTRY = [
+    REQUESTS, LATENCY, QUERIES, QUERY_TIME, SERIALIZER_TIME, RESPONSE_BYTES, REPEATED_QUERIES,
+]
+
+
+class RequestStats:
+    """
+    The database and serializer cost of one request.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.statements = Counter()
+        self._lock = threading.Lock()
+
+    def record_query(self, sql, seconds):
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+            self.statements[sql] += 1
+
+    def record_serializer(self, seconds):
+        with self._lock:
+            self.serializer_seconds += seconds
+
+
+def track_query(execute, sql, params, many, context):
+    """
+    Execute wrapper reporting each query to the current request's stats.
+    """
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record_query(sql, time.perf_counter() - started)
+
+
+def install_query_tracker(sender=None, connection=None, **kwargs):
+    """
+    Install track_query on a connection. Connected to connection_created.
+    """
+    if track_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_query)
+
+
+@contextmanager
+def track_serializer_time():
+    """
+    Add the time spent in the block to the current request's serializer time.
+    """
+    stats = current_stats.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.record_serializer(time.perf_counter() - started)
+
+
+def get_route(request):
+    """
+    Return the namespaced route name of a request, e.g. `tasks:task-list`.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    return match.view_name or match._func_path
+
+
+def record(request, response, stats, seconds):
+    """
+    Record a finished request.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+        response (HttpResponse): The response.
+        stats (RequestStats): The cost of the request.
+        seconds (float): The request latency.
+    """
+    labels = (get_route(request), request.method)
+    REQUESTS.inc(labels + (str(response.status_code),))
+    LATENCY.observe(labels, seconds)
+    QUERIES.observe(labels, stats.queries)
+    QUERY_TIME.inc(labels, stats.query_seconds)
+    SERIALIZER_TIME.inc(labels, stats.serializer_seconds)
+    if not response.streaming:
+        RESPONSE_BYTES.observe(labels, len(response.content))
+
+    threshold = getattr(settings, 'METRICS_N_PLUS_ONE_THRESHOLD', 10)
+    if stats.statements:
+        sql, count = stats.statements.most_common(1)[0]
+        if count >= threshold:
+            REPEATED_QUERIES.inc(labels)
+            logger.warning(
+                'Possible N+1 queries on %s %s: %d executions of %s',
+                request.method, labels[0], count, sql[:300],
+            )
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Record the latency, database cost, serializer time and response size of
+    every request.
+    """
+    connection_created.connect(install_query_tracker)
+    for connection in connections.all(initialized_only=True):
+        install_query_tracker(connection=connection)
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            stats = RequestStats()
+            token = current_stats.set(stats)
+            started = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                current_stats.reset(token)
+            record(request, response, stats, time.perf_counter() - started)
+            return response
+    else:
+        def middleware(request):
+            stats = RequestStats()
+            token = current_stats.set(stats)
+            started = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                current_stats.reset(token)
+            record(request, response, stats, time.perf_counter() - started)
+            return response
+    return middleware
+
+
+def expose_stats(name, help_text, stats):
+    """
+    Render a dict of hit/miss counters as Prometheus gauges.
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+    lines.extend(f'{name}{{counter="{key}"}} {value}' for key, value in sorted(stats.items()))
+    return lines
+
+
+def metrics_view(request):
+    """
+    Expose the metrics of this worker process in the Prometheus text format.
+
+    Clients must send `Authorization: Bearer <METRICS_TOKEN>` from an IP
+    listed in METRICS_ALLOWED_IPS. Behind a proxy every client shares the
+    proxy's address, so the token is what keeps the endpoint private; it is
+    disabled while METRICS_TOKEN is unset.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The metrics, or 403.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    sent = request.headers.get('Authorization', '')
+    if (
+        not token
+        or not hmac.compare_digest(sent.encode(), f'Bearer {token}'.encode())
+        or request.META.get('REMOTE_ADDR') not in allowed
+    ):
+        return HttpResponseForbidden()
+
+    from tasks.cache import get_cache_stats
+    from users.authentication import get_token_cache_stats
+
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    lines.extend(expose_stats(
+        'task_response_cache', 'Task response cache counters of this process.', get_cache_stats(),
+    ))
+    lines.extend(expose_stats(
+        'token_auth_cache', 'Token authentication cache counters of this process.',
+        get_token_cache_stats(),
+    ))
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,177 @@
+"""
+Read-replica routing for task_manager.
+
+The `default` database is the primary and every alias in the
+DATABASE_REPLICAS setting is a read replica of it. replica_routing_middleware
+picks a replica for each safe-method request (GET, HEAD, OPTIONS), and
+ReplicaRouter sends that request's reads to it; writes, reads inside a
+transaction and anything outside a request (management commands, the
+overdue sweeper) use the primary.
+
+Reads that fill a shared cache must not come from a replica: the cache
+version moves when a write commits on the primary, and a lagging replica
+would let a stale body be stored under the new version. Such reads run
+inside read_from_primary().
+
+A StreamingHttpResponse body is consumed after the middleware has reset the
+read alias, so streaming views wrap their iterator in bind_read_alias() to
+keep reading from the request's replica.
+
+After a client sends a write, its reads are pinned to the primary for
+DATABASE_REPLICA_PIN_SECONDS so it always sees its own changes despite
+replication lag. Clients are identified by a hash of their Authorization
+header or session cookie, and pins are kept in the shared cache so they
+hold across workers.
+"""
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.decorators import sync_and_async_middleware
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_KEY_PREFIX = 'db:pin'
+
+# The replica alias serving the current request's reads, or None for the primary.
+read_alias = ContextVar('read_alias', default=None)
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads to the replica chosen for the request.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication.
+        return db == DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Send the reads made inside the block to the primary.
+    """
+    token = read_alias.set(None)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+def bind_read_alias(iterable):
+    """
+    Bind an iterable to the current read alias.
+
+    Parameters:
+        iterable (iterable): A lazy iterable, such as a streamed response body.
+
+    Returns:
+        generator: Yields the items of the iterable, making its reads on the
+        alias that was current when bind_read_alias was called.
+    """
+    alias = read_alias.get()
+
+    def iterate():
+        iterator = iter(iterable)
+        while True:
+            token = read_alias.set(alias)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                read_alias.reset(token)
+            yield item
+    return iterate()
+
+
+def get_replicas():
+    """Return the aliases of the configured read replicas."""
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _pin_cache():
+    return caches[getattr(settings, 'DATABASE_REPLICA_PIN_CACHE_ALIAS', 'default')]
+
+
+def get_pin_key(request):
+    """
+    Build the pin cache key of the client sending a request.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        str: The cache key, or None for a client without credentials.
+    """
+    credentials = (
+        request.headers.get('Authorization')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not credentials:
+        return None
+    return f'{PIN_KEY_PREFIX}:{hashlib.sha256(credentials.encode()).hexdigest()}'
+
+
+def _pin_timeout():
+    return getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5)
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    """
+    Route the reads of safe-method requests to a replica, and pin clients
+    to the primary for a short while after they write.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            replicas = get_replicas()
+            if not replicas:
+                return await get_response(request)
+            key = get_pin_key(request)
+            alias = None
+            if request.method in SAFE_METHODS:
+                pinned = key is not None and await _pin_cache().aget(key)
+                alias = None if pinned else random.choice(replicas)
+            token = read_alias.set(alias)
+            try:
+                return await get_response(request)
+            finally:
+                read_alias.reset(token)
+                if key is not None and request.method not in SAFE_METHODS:
+                    await _pin_cache().aset(key, True, _pin_timeout())
+    else:
+        def middleware(request):
+            replicas = get_replicas()
+            if not replicas:
+                return get_response(request)
+            key = get_pin_key(request)
+            alias = None
+            if request.method in SAFE_METHODS:
+                pinned = key is not None and _pin_cache().get(key)
+                alias = None if pinned else random.choice(replicas)
+            token = read_alias.set(alias)
+            try:
+                return get_response(request)
+            finally:
+                read_alias.reset(token)
+                if key is not None and request.method not in SAFE_METHODS:
+                    _pin_cache().set(key, True, _pin_timeout())
+    return middleware
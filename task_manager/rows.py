@@ -0,0 +1,63 @@
+"""
+Row file parsing for task_manager.
+
+The task import (tasks.importer) and user provisioning (the provision_users
+command) read the same file formats:
+
+    csv       one row per line, with a header row naming the columns
+    ndjson    one JSON object per line; blank lines are skipped
+
+Rows are parsed lazily and numbered from 1, not counting the CSV header, so
+files larger than memory can be processed in chunks.
+"""
+import csv
+import io
+import json
+import os
+
+FORMATS = ('csv', 'ndjson')
+
+
+def guess_format(name):
+    """
+    Guess the file format from a file name.
+
+    Returns:
+        str: 'csv' or 'ndjson', or None if the extension is unknown.
+    """
+    extension = os.path.splitext(name or '')[1].lower().lstrip('.')
+    if extension in ('json', 'jsonl'):
+        return 'ndjson'
+    return extension if extension in FORMATS else None
+
+
+def open_text(file):
+    """Wrap a binary file in a UTF-8 text stream, as the csv module expects."""
+    return io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+
+
+def parse_rows(stream, format):
+    """
+    Parse a text stream into rows, lazily.
+
+    Parameters:
+        stream (file): The text stream to read.
+        format (str): 'csv' (with a header row) or 'ndjson'.
+
+    Yields:
+        tuple: The row number and the row dict, or None for a line that is
+        not a JSON object.
+    """
+    if format == 'csv':
+        yield from enumerate(csv.DictReader(stream), start=1)
+        return
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 from pathlib import Path
 import os
+from .database import database_from_env, replicas_from_env, sqlite_pragmas_from_env
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -45,10 +46,12 @@ INSTALLED_APPS = [
 
     # my app
     'tasks',
-    'users'
+    'users',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'task_manager.metrics.metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +59,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'task_manager.routers.replica_routing_middleware',
 ]
 
 ROOT_URLCONF = 'task_manager.urls'
@@ -81,14 +85,81 @@ WSGI_APPLICATION = 'task_manager.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+# Configured from DATABASE_URL and the DB_*/SQLITE_* environment variables;
+# SQLite at BASE_DIR / 'db.sqlite3' by default. See task_manager.database.
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_from_env(BASE_DIR),
+    **replicas_from_env(BASE_DIR),
 }
 
+SQLITE_PRAGMAS = sqlite_pragmas_from_env()
+
+# Read replicas
+# Safe-method requests read from a replica (DATABASE_REPLICA_URLS); clients
+# read from the primary for DATABASE_REPLICA_PIN_SECONDS after a write.
+# See task_manager.routers.
+
+DATABASE_ROUTERS = ['task_manager.routers.ReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_REPLICA_PIN_SECONDS = 5
+DATABASE_REPLICA_PIN_CACHE_ALIAS = 'default'
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Redis is used when REDIS_URL is set; otherwise a per-process local memory
+# cache is used (development and tests).
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+TASKS_CACHE_ALIAS = 'default'
+TASKS_CACHE_TIMEOUT = 300
+
+
+# Task change feed
+# Events are shared between processes through Redis pub/sub when a URL is
+# set; otherwise they only reach subscribers of the same process. Publishing
+# gives up after TASKS_EVENTS_PUBLISH_TIMEOUT seconds, and listeners retry
+# lost connections after TASKS_EVENTS_RECONNECT_DELAY seconds, doubling.
+
+TASKS_EVENTS_REDIS_URL = os.environ.get('REDIS_URL')
+TASKS_EVENTS_PUBLISH_TIMEOUT = 0.25
+TASKS_EVENTS_RECONNECT_DELAY = 1
+TASKS_EVENTS_HEARTBEAT = 15
+TASKS_EVENTS_QUEUE_SIZE = 100
+
+
+# Async API views
+# Serve the task list/detail and user directory endpoints with the async
+# views (tasks.async_views, users.async_views) instead of the DRF viewsets.
+# Only useful under the ASGI application.
+
+ASYNC_API_VIEWS = os.environ.get('ASYNC_API_VIEWS', '').lower() in ('1', 'true', 'yes')
+
+
+# Metrics
+# Per-route request metrics are exposed at /metrics to scrapers sending
+# `Authorization: Bearer $METRICS_TOKEN` from these client IPs (disabled
+# while METRICS_TOKEN is unset); requests repeating one SQL statement this
+# many times are logged as N+1.
+
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+METRICS_N_PLUS_ONE_THRESHOLD = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -109,6 +180,22 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# New hashes use PASSWORD_PBKDF2_ITERATIONS (Django's default when unset),
+# and are computed by a pool of PASSWORD_HASHING_WORKERS processes off the
+# request thread (0 hashes inline); see users.passwords.
+
+PASSWORD_HASHERS = [
+    'users.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 0)) or None
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', 2))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -135,9 +222,47 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
 }
+
+# Token authentication cache
+# Authenticated tokens are kept in a per-process LRU for a few seconds and in
+# the shared cache (Redis when REDIS_URL is set) for longer; see
+# users.authentication.
+
+TOKEN_AUTH_CACHE_ALIAS = 'default'
+TOKEN_AUTH_CACHE_TIMEOUT = 300
+TOKEN_AUTH_LOCAL_CACHE_SIZE = 10000
+TOKEN_AUTH_LOCAL_CACHE_TIMEOUT = 10
+
+# Task list pagination
+# Default and maximum page sizes for the keyset paginated task endpoints.
+
+TASKS_PAGE_SIZE = 50
+TASKS_MAX_PAGE_SIZE = 500
+
+
+# Bulk task endpoints
+# Maximum items per bulk request and rows per INSERT/UPDATE statement.
+
+TASKS_BULK_MAX_ITEMS = 10000
+TASKS_BULK_BATCH_SIZE = 500
+
+
+# Delta sync
+# Deleted task ids are kept this long for /api/v1/tasks/changes/ clients;
+# older sync tokens get a 410 and must do a full sync.
+
+TASKS_TOMBSTONE_RETENTION_DAYS = 30
+TASKS_CHANGES_SETTLE_SECONDS = 2
+
+
+# Overdue sweeper
+# Schedule `manage.py sweep_overdue_tasks` with cron, or run it with
+# --interval in a dedicated process.
+
+TASKS_OVERDUE_SWEEP_CHUNK_SIZE = 5000
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from .signals import create_search_index
+        from task_manager.database import apply_sqlite_pragmas
+        post_migrate.connect(create_search_index, sender=self)
+        connection_created.connect(apply_sqlite_pragmas)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+This module defines the asynchronous variants of the task API views.
+
+They serve the same URLs, parameters and payloads as the list, retrieve,
+create, update and destroy actions of TaskViewSet, but run on the ASGI
+event loop: reads use the async ORM, so a request waiting on the database
+does not hold a worker thread. Writes go through the task services in a
+worker thread, because Django does not run transactions in async code yet
+and the services update the counters, search index, cache and change feed
+in one transaction.
+
+They replace the DRF routes when the ASYNC_API_VIEWS setting is enabled,
+and must be served through the ASGI application.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from users.authentication import aauthenticate
+from .models import Task
+from .cache import acached_data, aget_collection_version
+from .filters import TaskFilterBackend
+from .representation import FastJSONRenderer
+from .conditional import aconditional_response, make_etag
+from .services import create_task, update_task, delete_task
+from .views import TaskViewSet
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    """
+    Render data the way the DRF views do.
+
+    Parameters:
+        data: The JSON serializable response data.
+        status (int, optional): The HTTP status code.
+
+    Returns:
+        HttpResponse: The JSON response.
+    """
+    return HttpResponse(FastJSONRenderer().render(data), content_type='application/json', status=status)
+
+
+def error_response(exc):
+    """
+    Convert a DRF exception into a response, like DRF's exception handler.
+
+    Parameters:
+        exc (APIException): The exception raised while handling the request.
+
+    Returns:
+        HttpResponse: The error response.
+    """
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(detail, status=exc.status_code)
+
+
+def get_view(request, user, action, **kwargs):
+    """
+    Build a TaskViewSet bound to a request, for its filters, paginator and
+    serializer context.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+        user (User): The authenticated user.
+        action (str): The viewset action being served.
+        **kwargs: The URL keyword arguments.
+
+    Returns:
+        TaskViewSet: The viewset, whose `request` is the DRF request.
+    """
+    view = TaskViewSet(
+        action_map={request.method.lower(): action}, args=(), kwargs=kwargs, format_kwarg=None,
+    )
+    view.request = view.initialize_request(request, **kwargs)
+    view.request.user = user
+    return view
+
+
+def not_found():
+    """Return the 404 response of a missing task."""
+    return json_response({'detail': 'No Task matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+
+
+def unauthorized():
+    """Return the 401 response of an unauthenticated request."""
+    response = json_response(
+        {'detail': 'Authentication credentials were not provided.'},
+        status=status.HTTP_401_UNAUTHORIZED,
+    )
+    response['WWW-Authenticate'] = 'Token'
+    return response
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'HEAD', 'POST'])
+async def task_list(request):
+    """
+    List tasks (GET) or create a task (POST).
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The same response as TaskViewSet.list or .create.
+    """
+    user = await aauthenticate(request, allow_session=False)
+    if user is None:
+        return unauthorized()
+    if request.method == 'POST':
+        return await create(get_view(request, user, 'create'))
+    return await list_tasks(get_view(request, user, 'list'))
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'HEAD', 'PUT', 'PATCH', 'DELETE'])
+async def task_detail(request, pk):
+    """
+    Retrieve (GET), update (PUT/PATCH) or delete (DELETE) a task.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The task id.
+
+    Returns:
+        HttpResponse: The same response as the matching TaskViewSet action.
+    """
+    user = await aauthenticate(request, allow_session=False)
+    if user is None:
+        return unauthorized()
+    if request.method in ('PUT', 'PATCH'):
+        return await update(get_view(request, user, 'update', pk=pk), pk)
+    if request.method == 'DELETE':
+        return await destroy(get_view(request, user, 'destroy', pk=pk), pk)
+    return await retrieve(get_view(request, user, 'retrieve', pk=pk), pk)
+
+
+async def list_tasks(view):
+    """
+    List tasks with the filters, sorting, pagination, conditional GET and
+    response cache of TaskViewSet.list.
+
+    Parameters:
+        view (TaskViewSet): The viewset bound to the request.
+
+    Returns:
+        HttpResponse: The serialized tasks, or a 304 response.
+    """
+    request, user = view.request, view.request.user
+    try:
+        queryset = view.filter_queryset(view.get_queryset())
+        plan = view.get_row_plan()
+        assignee = TaskFilterBackend.get_assignee(request)
+    except APIException as e:
+        return error_response(e)
+
+    async def build_data():
+        page_queryset = view.paginator.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return plan.represent(await plan.afetch(queryset))
+        page = view.paginator.set_page(await plan.afetch(page_queryset), position=plan.position)
+        return view.paginator.get_paginated_response(plan.represent(page)).data
+
+    async def build_response():
+        try:
+            return json_response(await acached_data(request, user, build_data, assignee))
+        except APIException as e:
+            return error_response(e)
+
+    etag = make_etag(request.get_full_path(), user.pk, await aget_collection_version(assignee))
+    return await aconditional_response(request, etag, None, build_response)
+
+
+async def retrieve(view, pk):
+    """
+    Retrieve a task with the conditional GET and response cache of
+    TaskViewSet.retrieve.
+
+    Parameters:
+        view (TaskViewSet): The viewset bound to the request.
+        pk (int): The task id.
+
+    Returns:
+        HttpResponse: The serialized task, a 304 or a 404 response.
+    """
+    request, user = view.request, view.request.user
+    updated_at = await view.get_queryset().filter(pk=pk).values_list('updated_at', flat=True).afirst()
+    if updated_at is None:
+        return not_found()
+
+    async def build_data():
+        return view.get_serializer(await view.get_queryset().aget(pk=pk)).data
+
+    async def build_response():
+        try:
+            return json_response(await acached_data(request, user, build_data))
+        except Task.DoesNotExist:
+            return not_found()
+
+    etag = make_etag(request.get_full_path(), user.pk, updated_at.isoformat())
+    return await aconditional_response(request, etag, updated_at, build_response)
+
+
+async def create(view):
+    """
+    Create a task through the task services.
+
+    Parameters:
+        view (TaskViewSet): The viewset bound to the request.
+
+    Returns:
+        HttpResponse: The serialized task (201) or the validation errors (400).
+    """
+    try:
+        serializer = await sync_to_async(create_task)(view.request.data, view.get_serializer_context())
+        return json_response(serializer.data, status=status.HTTP_201_CREATED)
+    except APIException as e:
+        return error_response(e)
+    except Exception:
+        return json_response(
+            {"error": "Internal server error"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+async def update(view, pk):
+    """
+    Partially update a task through the task services.
+
+    Parameters:
+        view (TaskViewSet): The viewset bound to the request.
+        pk (int): The task id.
+
+    Returns:
+        HttpResponse: The serialized task, the validation errors (400) or 404.
+    """
+    try:
+        task = await view.get_queryset().aget(pk=pk)
+    except Task.DoesNotExist:
+        return not_found()
+    try:
+        serializer = await sync_to_async(update_task)(task, view.request.data, view.get_serializer_context())
+        return json_response(serializer.data)
+    except APIException as e:
+        return error_response(e)
+    except Exception:
+        return json_response(
+            {"error": "Internal server error"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+async def destroy(view, pk):
+    """
+    Delete a task through the task services.
+
+    Parameters:
+        view (TaskViewSet): The viewset bound to the request.
+        pk (int): The task id.
+
+    Returns:
+        HttpResponse: An empty 204 response, or 404.
+    """
+    try:
+        task = await view.get_queryset().aget(pk=pk)
+    except Task.DoesNotExist:
+        return not_found()
+    await sync_to_async(delete_task)(task)
+    return HttpResponse(status=status.HTTP_204_NO_CONTENT)
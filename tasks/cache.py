@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+This module defines the read-through response cache for the tasks app.
+
+Cached responses are keyed by a global tasks version, the requesting user
+and the full request URL. Every task write bumps the version once the
+transaction commits, so entries written before the change are never read
+again and simply expire.
+
+Responses restricted to one assignee's tasks (`scope=mine` or
+`assigned_to=<id>`) are keyed by that assignee's version instead, which is
+only reset by writes to their tasks, so other users' writes leave them
+cached.
+
+Misses are built from the primary database: the version moves when a write
+commits there, and a lagging read replica would otherwise store a stale
+response under the new version.
+"""
+import hashlib
+import threading
+import time
+from functools import partial
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+from task_manager.routers import read_from_primary
+
+VERSION_KEY = 'tasks:version'
+KEY_PREFIX = 'tasks:response'
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the cache backend used for task responses."""
+    return caches[getattr(settings, 'TASKS_CACHE_ALIAS', 'default')]
+
+
+def _version_key(assignee=None):
+    return VERSION_KEY if assignee is None else f'{VERSION_KEY}:user:{assignee}'
+
+
+def get_version(assignee=None):
+    """
+    Return the current tasks version, initialising it if it is missing.
+
+    Parameters:
+        assignee (int, optional): Return the version of this user's tasks
+            instead of the global one.
+
+    Returns:
+        int: The current version.
+    """
+    cache = get_cache()
+    key = _version_key(assignee)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted version never repeats an old one.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(assignee=None):
+    """
+    Asynchronous variant of get_version.
+
+    Returns:
+        int: The current version.
+    """
+    cache = get_cache()
+    key = _version_key(assignee)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(assignees=()):
+    """
+    Increment the tasks version, invalidating every cached task response
+    that is not scoped to one assignee.
+
+    Parameters:
+        assignees (iterable, optional): Also invalidate the responses scoped
+            to these users. Their versions are deleted, so they are seeded
+            again from the clock, with one round trip for all of them.
+    """
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+    keys = [_version_key(assignee) for assignee in assignees]
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate_task_cache(assignees=()):
+    """
+    Invalidate cached task responses once the current transaction commits.
+
+    Parameters:
+        assignees (iterable, optional): The users whose tasks were written,
+            before and after the change.
+    """
+    assignees = sorted(set(assignees))
+    transaction.on_commit(partial(bump_version, assignees))
+
+
+def get_collection_version(assignee=None):
+    """
+    Return the version task collections are cached and validated against.
+
+    Parameters:
+        assignee (int, optional): The user the collection is restricted to.
+
+    Returns:
+        str: The version, scoped to the assignee if one is given.
+    """
+    return _scoped_version(get_version(assignee), assignee)
+
+
+async def aget_collection_version(assignee=None):
+    """
+    Asynchronous variant of get_collection_version.
+
+    Returns:
+        str: The version, scoped to the assignee if one is given.
+    """
+    return _scoped_version(await aget_version(assignee), assignee)
+
+
+def get_cache_key(request, assignee=None):
+    """
+    Build the cache key of a request for the current tasks version.
+
+    Parameters:
+        request (Request): The HTTP request object.
+        assignee (int, optional): The user the response is restricted to.
+
+    Returns:
+        str: The cache key.
+    """
+    return _make_key(get_collection_version(assignee), request.user.pk, request)
+
+
+def _scoped_version(version, assignee):
+    return version if assignee is None else f'user{assignee}-{version}'
+
+
+def _make_key(version, user_pk, request):
+    url = hashlib.sha256(request.build_absolute_uri().encode()).hexdigest()
+    return f'{KEY_PREFIX}:{version}:{user_pk}:{url}'
+
+
+def cached_response(request, build_response, assignee=None):
+    """
+    Return the cached response data for a request, building it on a miss.
+
+    Only successful responses are cached.
+
+    Parameters:
+        request (Request): The HTTP request object.
+        build_response (callable): Builds the Response when it is not cached.
+        assignee (int, optional): The user the response is restricted to.
+
+    Returns:
+        Response: The cached or freshly built response.
+    """
+    cache = get_cache()
+    key = get_cache_key(request, assignee)
+    data = cache.get(key)
+    if data is not None:
+        _record('hits')
+        return Response(data)
+
+    _record('misses')
+    with read_from_primary():
+        response = build_response()
+    if response.status_code == 200:
+        cache.set(key, response.data, getattr(settings, 'TASKS_CACHE_TIMEOUT', 300))
+    return response
+
+
+async def acached_data(request, user, build_data, assignee=None):
+    """
+    Asynchronous read-through cache for the async views.
+
+    Entries share their keys with cached_response, so the sync and async
+    views serve each other's cached responses.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+        user (User): The authenticated user.
+        build_data (callable): Coroutine function building the response data
+            on a miss. It raises instead of returning an error, so only
+            successful responses are cached.
+        assignee (int, optional): The user the response is restricted to.
+
+    Returns:
+        The cached or freshly built response data.
+    """
+    cache = get_cache()
+    key = _make_key(await aget_collection_version(assignee), user.pk, request)
+    data = await cache.aget(key)
+    if data is not None:
+        _record('hits')
+        return data
+
+    _record('misses')
+    with read_from_primary():
+        data = await build_data()
+    await cache.aset(key, data, getattr(settings, 'TASKS_CACHE_TIMEOUT', 300))
+    return data
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def get_cache_stats():
+    """
+    Return the hit/miss counters of this process.
+
+    Returns:
+        dict: The number of hits and misses and the hit ratio.
+    """
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
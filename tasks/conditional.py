@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+This module defines the conditional GET support (ETag / Last-Modified) for
+the task endpoints.
+
+A single task is validated by its updated_at. A collection is validated
+by the response cache version (see tasks/cache.py), which every committed
+write to its tasks moves, so checking it costs no query. Collections send
+no Last-Modified, as a delete would not move it.
+"""
+import hashlib
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """
+    Build a strong ETag from the given parts.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified_response(request, etag, last_modified):
+    """
+    Return a 304 Not Modified response if the client's copy is current.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+        etag (str): The ETag of the current representation.
+        last_modified (datetime): When the representation last changed, or None.
+
+    Returns:
+        HttpResponse: The 304 response, or None if the response must be built.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Set the ETag, Last-Modified and Cache-Control headers of a response.
+
+    Parameters:
+        response (HttpResponse): The 200 or 304 response.
+        etag (str): The ETag of the current representation.
+        last_modified (datetime): When the representation last changed, or None.
+
+    Returns:
+        HttpResponse: The response.
+    """
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(int(last_modified.timestamp()))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, etag, last_modified, build_response):
+    """
+    Return 304 Not Modified if the client's copy is current, otherwise build
+    the response. Either way the ETag and Last-Modified headers are set.
+
+    Parameters:
+        request (Request): The HTTP request object.
+        etag (str): The ETag of the current representation.
+        last_modified (datetime): When the representation last changed, or None.
+        build_response (callable): Builds the full response.
+
+    Returns:
+        Response: The 304 or the full response.
+    """
+    response = not_modified_response(request, etag, last_modified)
+    if response is None:
+        response = build_response()
+        if response.status_code != 200:
+            return response
+    return set_validators(response, etag, last_modified)
+
+
+async def aconditional_response(request, etag, last_modified, build_response):
+    """
+    Asynchronous variant of conditional_response.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+        etag (str): The ETag of the current representation.
+        last_modified (datetime): When the representation last changed, or None.
+        build_response (callable): Coroutine function building the full response.
+
+    Returns:
+        HttpResponse: The 304 or the full response.
+    """
+    response = not_modified_response(request, etag, last_modified)
+    if response is None:
+        response = await build_response()
+        if response.status_code != 200:
+            return response
+    return set_validators(response, etag, last_modified)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+This module maintains the TaskCounter table.
+
+The task services describe each write as a set of deltas keyed by
+(scope, field, value) and apply them in the write's transaction, so the
+per-status/priority/category counts can be read in O(1) instead of
+counting the tasks table. reconcile_counters rebuilds the table from
+scratch to repair any drift.
+"""
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Q
+from .models import Task, TaskCounter
+
+COUNTED_FIELDS = ('status', 'priority', 'category')
+SCOPE_ALL = 'all'
+
+# Above this many distinct delta values, e.g. for a bulk import, deltas are
+# applied with one executemany UPDATE instead of one UPDATE per value.
+MAX_GROUPED_DELTAS = 8
+
+
+def user_scope(user_id):
+    """Return the counter scope of the tasks assigned to a user."""
+    return f'user:{user_id}'
+
+
+def delta_users(deltas):
+    """
+    Return the ids of the users whose counters a set of deltas touches,
+    including deltas that cancel out, e.g. for an edit of the title.
+    """
+    prefix = user_scope('')
+    return {int(scope[len(prefix):]) for scope, _, _ in deltas if scope.startswith(prefix)}
+
+
+def task_deltas(task, sign=1, deltas=None):
+    """
+    Add the counter deltas of one task to a Counter.
+
+    Parameters:
+        task (Task or dict): A task, or a dict with the counted fields and
+            `assigned_to_id`.
+        sign (int): 1 when the task is added, -1 when it is removed.
+        deltas (Counter, optional): The Counter to add to.
+
+    Returns:
+        Counter: The deltas keyed by (scope, field, value).
+    """
+    deltas = Counter() if deltas is None else deltas
+    get = task.get if isinstance(task, dict) else lambda name: getattr(task, name)
+    for scope in (SCOPE_ALL, user_scope(get('assigned_to_id'))):
+        for field in COUNTED_FIELDS:
+            deltas[(scope, field, get(field))] += sign
+    return deltas
+
+
+def grouped_deltas(queryset, sign=-1, deltas=None):
+    """
+    Add the counter deltas of every task in a queryset, computed in SQL.
+
+    Parameters:
+        queryset (QuerySet): The tasks being added or removed.
+        sign (int): 1 when the tasks are added, -1 when they are removed.
+        deltas (Counter, optional): The Counter to add to.
+
+    Returns:
+        Counter: The deltas keyed by (scope, field, value).
+    """
+    deltas = Counter() if deltas is None else deltas
+    rows = queryset.order_by().values('assigned_to_id', *COUNTED_FIELDS).annotate(n=Count('id'))
+    for row in rows:
+        task_deltas(row, sign * row['n'], deltas)
+    return deltas
+
+
+def snapshot(task):
+    """
+    Capture the counted values of a task before it is modified.
+
+    Parameters:
+        task (Task): The task about to change.
+
+    Returns:
+        dict: The counted fields and `assigned_to_id`.
+    """
+    values = {field: getattr(task, field) for field in COUNTED_FIELDS}
+    values['assigned_to_id'] = task.assigned_to_id
+    return values
+
+
+def apply_deltas(deltas):
+    """
+    Apply counter deltas with one UPDATE per distinct delta value.
+
+    Missing counter rows are created first (ignoring rows created
+    concurrently) so no increment is lost. Must run inside the transaction
+    of the task write.
+
+    Parameters:
+        deltas (Counter): The deltas keyed by (scope, field, value).
+    """
+    by_delta = defaultdict(list)
+    for key, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(key)
+    if len(by_delta) > MAX_GROUPED_DELTAS:
+        _apply_deltas_per_key(deltas)
+        return
+
+    for delta, keys in by_delta.items():
+        condition = reduce(or_, (Q(scope=scope, field=field, value=value) for scope, field, value in keys))
+        updated = TaskCounter.objects.filter(condition).update(count=F('count') + delta)
+        if updated == len(keys):
+            continue
+        existing = set(TaskCounter.objects.filter(condition).values_list('scope', 'field', 'value'))
+        missing = [key for key in keys if key not in existing]
+        TaskCounter.objects.bulk_create(
+            [TaskCounter(scope=scope, field=field, value=value) for scope, field, value in missing],
+            ignore_conflicts=True,
+        )
+        condition = reduce(or_, (Q(scope=scope, field=field, value=value) for scope, field, value in missing))
+        TaskCounter.objects.filter(condition).update(count=F('count') + delta)
+
+
+def _apply_deltas_per_key(deltas):
+    """
+    Apply many distinct deltas with one UPDATE per key through a single
+    executemany, creating the missing counter rows first if any.
+    """
+    rows = [(delta, scope, field, value) for (scope, field, value), delta in deltas.items() if delta]
+    connection = connections[router.db_for_write(TaskCounter)]
+    quote = connection.ops.quote_name
+    sql = (
+        f"UPDATE {quote(TaskCounter._meta.db_table)} SET {quote('count')} = {quote('count')} + %s "
+        f"WHERE {quote('scope')} = %s AND {quote('field')} = %s AND {quote('value')} = %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+        if cursor.rowcount == len(rows):
+            return
+        scopes = {scope for _, scope, _, _ in rows}
+        existing = set(TaskCounter.objects.filter(scope__in=scopes).values_list('scope', 'field', 'value'))
+        missing = [row for row in rows if row[1:] not in existing]
+        # Rows created concurrently are ignored, and the missing deltas are
+        # applied by UPDATE either way.
+        TaskCounter.objects.bulk_create(
+            [TaskCounter(scope=scope, field=field, value=value) for _, scope, field, value in missing],
+            ignore_conflicts=True,
+        )
+        cursor.executemany(sql, missing)
+
+
+def get_counts(scope):
+    """
+    Read the task counts of a scope.
+
+    Parameters:
+        scope (str): SCOPE_ALL or a user scope.
+
+    Returns:
+        dict: For each counted field, the number of tasks per value. Every
+        status and priority choice is present, categories only when used.
+    """
+    counts = {
+        'status': {value: 0 for value, _ in Task.STATUS},
+        'priority': {value: 0 for value, _ in Task.PRIORITY},
+        'category': {},
+    }
+    for field, value, count in TaskCounter.objects.filter(scope=scope).values_list('field', 'value', 'count'):
+        if count or field != 'category':
+            counts[field][value] = count
+    return counts
+
+
+def reconcile_counters():
+    """
+    Rebuild every counter from the tasks table.
+
+    Returns:
+        int: The number of counters whose stored value was wrong.
+    """
+    with transaction.atomic():
+        expected = grouped_deltas(Task.objects.all(), sign=1)
+        current = {
+            (scope, field, value): count
+            for scope, field, value, count in TaskCounter.objects.select_for_update()
+            .values_list('scope', 'field', 'value', 'count')
+        }
+        drift = sum(
+            1 for key in set(current) | set(expected)
+            if current.get(key, 0) != expected.get(key, 0)
+        )
+        TaskCounter.objects.all().delete()
+        TaskCounter.objects.bulk_create(
+            [TaskCounter(scope=scope, field=field, value=value, count=count)
+             for (scope, field, value), count in expected.items() if count],
+            batch_size=1000,
+        )
+    return drift
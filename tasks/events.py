@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+This module defines the task change feed.
+
+Task writes publish small events (created, updated, deleted, reload) on an
+event bus once their transaction commits. Subscribers are asyncio queues
+living in the ASGI event loop, so an idle subscriber costs a queue and a
+suspended coroutine, and nothing polls the database.
+
+Two buses are available:
+    InProcessBus: delivers events to subscribers of the same process.
+    RedisBus: publishes events on a Redis channel; each process runs a
+        single listener that fans the channel out to its local subscribers,
+        so every worker sees every write.
+
+Publishing to Redis is best effort: it is bounded by
+TASKS_EVENTS_PUBLISH_TIMEOUT, and after a failure events are dropped for
+TASKS_EVENTS_RECONNECT_DELAY seconds instead of delaying every write. A
+listener that loses its connection reconnects with backoff and tells its
+subscribers to reload, since events may have been missed.
+
+The bus is Redis when TASKS_EVENTS_REDIS_URL is set, in-process otherwise.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'tasks:events'
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+class Subscription:
+    """
+    A subscriber's queue of pending events.
+
+    Attributes:
+        queue (asyncio.Queue): The pending events, bounded by
+            TASKS_EVENTS_QUEUE_SIZE.
+        loop (AbstractEventLoop): The event loop the queue belongs to.
+    """
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event):
+        """
+        Queue an event; must be called from the subscription's event loop.
+
+        A subscriber that falls behind gets a single reload event instead of
+        an unbounded backlog.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'reload'})
+
+    async def get(self):
+        """Wait for the next event."""
+        return await self.queue.get()
+
+
+class InProcessBus:
+    """
+    Event bus delivering events to the subscribers of this process.
+    """
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """
+        Register a subscriber in the running event loop.
+
+        Returns:
+            Subscription: The new subscription.
+        """
+        subscription = Subscription(
+            asyncio.get_running_loop(),
+            getattr(settings, 'TASKS_EVENTS_QUEUE_SIZE', 100),
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscriber."""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        """
+        Deliver an event to every local subscriber. Safe to call from any thread.
+
+        Parameters:
+            event (dict): The JSON serializable event.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; it is gone.
+                self.unsubscribe(subscription)
+
+    @property
+    def subscriber_count(self):
+        """The number of local subscribers."""
+        return len(self._subscriptions)
+
+
+class RedisBus(InProcessBus):
+    """
+    Event bus sharing events between processes through Redis pub/sub.
+
+    Parameters:
+        url (str): The Redis URL.
+    """
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        timeout = getattr(settings, 'TASKS_EVENTS_PUBLISH_TIMEOUT', 0.25)
+        self.client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._listeners = {}
+        self._publish_after = 0.0
+
+    def subscribe(self):
+        """
+        Register a subscriber, starting this loop's Redis listener if needed.
+
+        Returns:
+            Subscription: The new subscription.
+        """
+        subscription = super().subscribe()
+        loop = subscription.loop
+        with self._lock:
+            if loop not in self._listeners or self._listeners[loop].done():
+                self._listeners[loop] = loop.create_task(self._listen())
+        return subscription
+
+    def publish(self, event):
+        """
+        Publish an event on the Redis channel, dropping it if Redis is slow
+        or down.
+
+        Parameters:
+            event (dict): The JSON serializable event.
+        """
+        if time.monotonic() < self._publish_after:
+            return
+        try:
+            self.client.publish(CHANNEL, json.dumps(event))
+        except redis.RedisError as e:
+            self._publish_after = time.monotonic() + _reconnect_delay()
+            logger.warning('Dropped task event, Redis is unavailable: %s', e)
+
+    def _has_subscribers(self, loop):
+        with self._lock:
+            return any(subscription.loop is loop for subscription in self._subscriptions)
+
+    async def _listen(self):
+        """
+        Fan the Redis channel out to the local subscribers, reconnecting
+        while this event loop has subscribers.
+        """
+        loop = asyncio.get_running_loop()
+        delay = _reconnect_delay()
+        reconnecting = False
+        while self._has_subscribers(loop):
+            client = redis.asyncio.Redis.from_url(self.url)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL)
+                if reconnecting:
+                    # Events published while disconnected were missed.
+                    InProcessBus.publish(self, {'type': 'reload'})
+                delay = _reconnect_delay()
+                async for message in pubsub.listen():
+                    try:
+                        event = json.loads(message['data'])
+                    except (TypeError, ValueError):
+                        continue
+                    InProcessBus.publish(self, event)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Task event listener disconnected; retrying in %.1fs', delay)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+            reconnecting = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+
+def _reconnect_delay():
+    return getattr(settings, 'TASKS_EVENTS_RECONNECT_DELAY', 1)
+
+
+def get_event_bus():
+    """
+    Return the process-wide event bus.
+
+    Returns:
+        InProcessBus: The Redis bus when TASKS_EVENTS_REDIS_URL is set,
+        otherwise the in-process bus.
+    """
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            url = getattr(settings, 'TASKS_EVENTS_REDIS_URL', None)
+            _bus = RedisBus(url) if url else InProcessBus()
+    return _bus
+
+
+async def event_stream(bus=None):
+    """
+    Yield server-sent events for every task event, with keep-alive comments.
+
+    Parameters:
+        bus (InProcessBus, optional): The bus to subscribe to. Defaults to
+            the process-wide bus.
+
+    Yields:
+        str: SSE frames.
+    """
+    bus = bus or get_event_bus()
+    heartbeat = getattr(settings, 'TASKS_EVENTS_HEARTBEAT', 15)
+    subscription = bus.subscribe()
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        bus.unsubscribe(subscription)
+
+
+def publish_task_event(event_type, task_id=None, task=None):
+    """
+    Publish a task event once the current transaction commits.
+
+    Parameters:
+        event_type (str): 'created', 'updated', 'deleted' or 'reload'. A
+            reload tells clients to refetch the board, and is used for bulk
+            writes instead of one event per task.
+        task_id (int, optional): The id of the affected task.
+        task (dict, optional): The serialized task, for created/updated.
+    """
+    event = {'type': event_type}
+    if task_id is not None:
+        event['id'] = task_id
+    if task is not None:
+        event['task'] = task
+
+    def publish():
+        try:
+            get_event_bus().publish(event)
+        except Exception:
+            logger.exception('Failed to publish task event')
+
+    transaction.on_commit(publish)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+This module defines the streaming export of tasks as CSV or NDJSON.
+
+The export never holds more than one chunk of rows in memory: tasks are
+read with `values()` over a chunked `.iterator()` (a server-side cursor on
+PostgreSQL), the assignee's username is joined in the same query, and each
+chunk is encoded and handed to a StreamingHttpResponse before the next one
+is fetched.
+"""
+import csv
+import json
+from itertools import islice
+from django.conf import settings
+from rest_framework import renderers, serializers
+
+EXPORT_FIELDS = (
+    'id', 'title', 'description', 'status', 'priority', 'due_date',
+    'category', 'assigned_to', 'assigned_to_username', 'updated_at',
+)
+DATETIME_FIELDS = ('due_date', 'updated_at')
+COLUMNS = {'assigned_to_username': 'assigned_to__username'}
+
+
+def get_chunk_size():
+    """Return the number of rows fetched and encoded at a time."""
+    return getattr(settings, 'TASKS_EXPORT_CHUNK_SIZE', 2000)
+
+
+def export_rows(queryset, chunk_size=None):
+    """
+    Yield the exported tasks in chunks of row dicts.
+
+    Parameters:
+        queryset (QuerySet): The filtered and ordered tasks.
+        chunk_size (int, optional): The rows fetched per database round trip.
+
+    Yields:
+        list: Up to chunk_size dicts keyed by EXPORT_FIELDS, with datetimes
+        formatted as in the API.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    datetime_field = serializers.DateTimeField()
+    columns = [COLUMNS.get(field, field) for field in EXPORT_FIELDS]
+    rows = queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        records = []
+        for values in chunk:
+            record = dict(zip(EXPORT_FIELDS, values))
+            for field in DATETIME_FIELDS:
+                record[field] = datetime_field.to_representation(record[field])
+            records.append(record)
+        yield records
+
+
+class Echo:
+    """A file-like object whose write returns what it was given."""
+
+    def write(self, value):
+        return value
+
+
+def stream_ndjson(chunks):
+    """
+    Encode chunks of rows as newline-delimited JSON.
+
+    Yields:
+        bytes: One encoded chunk.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for chunk in chunks:
+        yield ''.join(encoder.encode(row) + '\n' for row in chunk).encode()
+
+
+def stream_csv(chunks):
+    """
+    Encode chunks of rows as CSV, starting with a header row.
+
+    Yields:
+        bytes: The header, then one encoded chunk at a time.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS).encode()
+    for chunk in chunks:
+        yield ''.join(writer.writerow(row.values()) for row in chunk).encode()
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """
+    Renderer selecting the NDJSON export. Data that is not streamed, such
+    as an error, is rendered as a single JSON line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+    stream = staticmethod(stream_ndjson)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b''.join(self.stream([[data]]))
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    """
+    Renderer selecting the CSV export. Data that is not streamed, such as
+    an error, is rendered as a header row and a value row.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+    stream = staticmethod(stream_csv)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not isinstance(data, dict):
+            data = {'detail': data}
+        writer = csv.writer(Echo())
+        return (writer.writerow(data.keys()) + writer.writerow(data.values())).encode()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""This module defines the filter backends for the tasks app."""
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+from .search import filter_by_search
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    Filter backend that narrows the task queryset using query parameters.
+
+    Supported parameters:
+        status (str): Exact match on the task status.
+        priority (str): Exact match on the task priority.
+        category (str): Exact match on the task category.
+        due_date (str): A date (YYYY-MM-DD) or datetime. Matches every task
+            due on that day, expressed as a range so the due_date indexes
+            can be used.
+        scope (str): `mine` for the requesting user's tasks, or `team`
+            (the default) for every task.
+        assigned_to (int): The tasks assigned to one user.
+
+    The assignee filters are served by the (assigned_to, status, due_date)
+    index, so they cost O(the user's tasks) however large the table is.
+
+    Empty values are ignored, which matches what the board sends when a
+    filter input is left blank.
+    """
+    exact_params = ('status', 'priority', 'category')
+    scopes = ('mine', 'team')
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Apply the query parameter filters to the queryset.
+
+        Parameters:
+            request (Request): The HTTP request object.
+            queryset (QuerySet): The queryset to filter.
+            view (APIView): The view the filter is applied to.
+
+        Returns:
+            QuerySet: The filtered queryset.
+
+        Raises:
+            ValidationError: If due_date is not a valid date or datetime, or
+                the scope or assigned_to is invalid.
+        """
+        params = request.query_params
+        filters = {
+            param: params[param]
+            for param in self.exact_params
+            if params.get(param)
+        }
+        assignee = self.get_assignee(request)
+        if assignee is not None:
+            filters['assigned_to_id'] = assignee
+        if params.get('due_date'):
+            start, end = self.get_day_range(params['due_date'])
+            filters['due_date__gte'] = start
+            filters['due_date__lt'] = end
+        return queryset.filter(**filters)
+
+    @classmethod
+    def get_assignee(cls, request):
+        """
+        Return the user a task list request is restricted to.
+
+        Parameters:
+            request (Request): The HTTP request object.
+
+        Returns:
+            int: The user id selected by `scope=mine` or `assigned_to`, or
+            None for team-wide requests.
+
+        Raises:
+            ValidationError: If the scope is unknown, assigned_to is not an
+                id, or both select different users.
+        """
+        params = request.query_params
+        scope = params.get('scope') or 'team'
+        if scope not in cls.scopes:
+            raise ValidationError({'scope': f'Use one of: {", ".join(cls.scopes)}.'})
+        assignee = request.user.pk if scope == 'mine' else None
+        if params.get('assigned_to'):
+            value = params['assigned_to']
+            if not value.isdigit():
+                raise ValidationError({'assigned_to': 'A valid integer is required.'})
+            if assignee is not None and int(value) != assignee:
+                raise ValidationError({'assigned_to': 'Cannot be combined with scope=mine.'})
+            assignee = int(value)
+        return assignee
+
+    @staticmethod
+    def get_day_range(value):
+        """
+        Convert a due_date parameter into a [start, end) datetime range.
+
+        Parameters:
+            value (str): The raw due_date query parameter.
+
+        Returns:
+            tuple: The aware start and end datetimes of the day.
+
+        Raises:
+            ValidationError: If the value cannot be parsed.
+        """
+        try:
+            day = parse_date(value)
+            if day is None:
+                moment = parse_datetime(value)
+                day = moment.date() if moment else None
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({'due_date': 'Enter a valid date (YYYY-MM-DD).'})
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        return start, start + timedelta(days=1)
+
+
+class TaskOrderingFilter(OrderingFilter):
+    """
+    Ordering backend driven by the `sort` query parameter, e.g.
+    `?sort=-priority` or `?sort=due_date,title`. Unknown fields are ignored.
+    """
+    ordering_param = 'sort'
+
+
+class TaskSearchFilter(SearchFilter):
+    """
+    Search backend driven by the `search` query parameter, matching against
+    the task title and description through the full-text search index.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Restrict the queryset to tasks matching every word of the search text.
+
+        Parameters:
+            request (Request): The HTTP request object.
+            queryset (QuerySet): The queryset to filter.
+            view (APIView): The view the filter is applied to.
+
+        Returns:
+            QuerySet: The filtered queryset.
+        """
+        return filter_by_search(queryset, request.query_params.get(self.search_param, ''))
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+This module defines the streaming import of tasks from CSV or NDJSON.
+
+Rows are parsed lazily and processed in chunks of TASKS_IMPORT_CHUNK_SIZE:
+
+    1. each column of the chunk is validated at once against the same rules
+       as TaskSerializer (choices, lengths, ISO 8601 due dates);
+    2. `assigned_to` values, user ids or usernames, are resolved with one
+       query per chunk for the values not seen before;
+    3. the valid rows are written in one transaction, together with their
+       search index entries and counter deltas.
+
+On SQLite the rows are inserted with a single executemany of prepared
+values, which skips the per-field model overhead of bulk_create and is
+several times faster; ids are recovered from last_insert_rowid() since the
+transaction holds the write lock. Other databases use bulk_create.
+
+Invalid rows are reported as rejects instead of failing the import, and a
+checkpoint records the last committed row so an interrupted import can be
+resumed. Rows are numbered from 1, not counting the CSV header.
+"""
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .cache import invalidate_task_cache
+from .counters import apply_deltas, delta_users, task_deltas
+from .events import publish_task_event
+from .models import Task
+from .search import index_id_range, index_rows
+
+REQUIRED = 'This field is required.'
+BLANK = 'This field may not be blank.'
+DATETIME_FORMAT = (
+    'Datetime has wrong format. Use one of these formats instead: '
+    'YYYY-MM-DDThh:mm[:ss[.uuuuuu]][+HH:MM|-HH:MM|Z].'
+)
+
+# The columns of the rows returned by validate_chunk.
+IMPORT_FIELDS = (
+    'title', 'description', 'status', 'priority', 'due_date', 'category', 'assigned_to_id',
+)
+STATUSES = frozenset(choice for choice, _ in Task.STATUS)
+PRIORITIES = frozenset(choice for choice, _ in Task.PRIORITY)
+
+
+def get_chunk_size():
+    """Return the number of rows validated and written per transaction."""
+    return getattr(settings, 'TASKS_IMPORT_CHUNK_SIZE', 5000)
+
+
+def _clean_text(column, errors, max_length=None):
+    cleaned = []
+    for index, value in enumerate(column):
+        if value is not None:
+            value = (value if isinstance(value, str) else str(value)).strip()
+        if value is None:
+            errors[index] = REQUIRED
+        elif not value:
+            errors[index] = BLANK
+        elif max_length and len(value) > max_length:
+            errors[index] = f'Ensure this field has no more than {max_length} characters.'
+        cleaned.append(value)
+    return cleaned
+
+
+def _clean_choice(column, errors, choices):
+    invalid = (i for i, value in enumerate(column) if not isinstance(value, str) or value not in choices)
+    for index in invalid:
+        value = column[index]
+        errors[index] = REQUIRED if value in (None, '') else f'"{value}" is not a valid choice.'
+    return column
+
+
+def _clean_datetime(column, errors):
+    default_timezone = timezone.get_default_timezone()
+    cleaned = []
+    for index, value in enumerate(column):
+        try:
+            moment = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            errors[index] = REQUIRED if value in (None, '') else DATETIME_FORMAT
+            moment = None
+        else:
+            if moment.tzinfo is None:
+                moment = timezone.make_aware(moment, default_timezone)
+        cleaned.append(moment)
+    return cleaned
+
+
+class AssigneeResolver:
+    """
+    Resolve `assigned_to` values, user ids or usernames, to user ids.
+
+    Values are cached, so each distinct value is looked up once per import.
+    A numeric value is taken as an id first and as a username otherwise.
+    """
+
+    def __init__(self):
+        self._ids = {}
+
+    def resolve(self, values):
+        """
+        Resolve a column of values with at most one query.
+
+        Parameters:
+            values (list): The raw `assigned_to` values.
+
+        Returns:
+            list: The user ids, None where the user does not exist.
+        """
+        keys = [None if value is None else str(value).strip() for value in values]
+        missing = {key for key in keys if key and key not in self._ids}
+        if missing:
+            ids = [int(key) for key in missing if key.isdigit()]
+            found = User.objects.filter(Q(pk__in=ids) | Q(username__in=missing))
+            by_id, by_username = {}, {}
+            for pk, username in found.values_list('pk', 'username'):
+                by_id[str(pk)] = pk
+                by_username[username] = pk
+            for key in missing:
+                self._ids[key] = by_id.get(key, by_username.get(key))
+        return [self._ids.get(key) if key else None for key in keys]
+
+
+def validate_chunk(rows, resolver):
+    """
+    Validate a chunk of rows column by column.
+
+    Parameters:
+        rows (list): (row number, row dict or None) tuples.
+        resolver (AssigneeResolver): Resolves the `assigned_to` column.
+
+    Returns:
+        tuple: The valid rows, as tuples of IMPORT_FIELDS values, and the
+        rejects, dicts with the row `number`, the raw `row` and its field
+        `errors`.
+    """
+    errors = [{} for _ in rows]
+    records = [row or {} for _, row in rows]
+
+    def column(field):
+        return [record.get(field) for record in records]
+
+    def check(field, clean, *args):
+        field_errors = [None] * len(rows)
+        values = clean(column(field), field_errors, *args)
+        for index, error in enumerate(field_errors):
+            if error:
+                errors[index][field] = [error]
+        return values
+
+    columns = [
+        check('title', _clean_text, 255),
+        check('description', _clean_text),
+        check('status', _clean_choice, STATUSES),
+        check('priority', _clean_choice, PRIORITIES),
+        check('due_date', _clean_datetime),
+        check('category', _clean_text, 255),
+    ]
+    assignees = [record.get('assigned_to') or record.get('assigned_to_username') for record in records]
+    user_ids = resolver.resolve(assignees)
+    for index, (value, user_id) in enumerate(zip(assignees, user_ids)):
+        if value in (None, ''):
+            errors[index]['assigned_to'] = [REQUIRED]
+        elif user_id is None:
+            errors[index]['assigned_to'] = [f'Invalid user "{value}" - object does not exist.']
+    columns.append(user_ids)
+
+    valid, rejects = [], []
+    for values, (number, row), row_errors in zip(zip(*columns), rows, errors):
+        if row is None:
+            rejects.append({
+                'number': number, 'row': None,
+                'errors': {'non_field_errors': ['Invalid JSON object.']},
+            })
+        elif row_errors:
+            rejects.append({'number': number, 'row': row, 'errors': row_errors})
+        else:
+            valid.append(values)
+    return valid, rejects
+
+
+def _insert_sqlite(connection, rows):
+    """Insert rows with one executemany and return the range of their ids."""
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    adapt = connection.ops.adapt_datetimefield_value
+    due_date = IMPORT_FIELDS.index('due_date')
+    fields = [Task._meta.get_field(name) for name in IMPORT_FIELDS + ('updated_at',)]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {quote(Task._meta.db_table)} "
+            f"({', '.join(quote(field.column) for field in fields)}) "
+            f"VALUES ({', '.join(['%s'] * len(fields))})",
+            [row[:due_date] + (adapt(row[due_date]),) + row[due_date + 1:] + (now,) for row in rows],
+        )
+        cursor.execute('SELECT last_insert_rowid()')
+        last_id = cursor.fetchone()[0]
+    return range(last_id - len(rows) + 1, last_id + 1)
+
+
+def write_chunk(rows):
+    """
+    Insert validated rows, their search index entries and counter deltas
+    in one transaction.
+
+    Parameters:
+        rows (list): Tuples of IMPORT_FIELDS values.
+    """
+    connection = connections[router.db_for_write(Task)]
+    with transaction.atomic(using=connection.alias):
+        if connection.vendor == 'sqlite':
+            ids = _insert_sqlite(connection, rows)
+            index_id_range(ids[0], ids[-1], connection.alias)
+        else:
+            tasks = Task.objects.bulk_create([Task(**dict(zip(IMPORT_FIELDS, row))) for row in rows])
+            index_rows([(task.pk, task.title, task.description) for task in tasks], connection.alias)
+        deltas = Counter()
+        groups = Counter((row[2], row[3], row[5], row[6]) for row in rows)
+        for (status, priority, category, user_id), n in groups.items():
+            task = {'status': status, 'priority': priority, 'category': category, 'assigned_to_id': user_id}
+            task_deltas(task, sign=n, deltas=deltas)
+        apply_deltas(deltas)
+        invalidate_task_cache(delta_users(deltas))
+
+
+def read_checkpoint(path):
+    """
+    Read an import checkpoint.
+
+    Returns:
+        dict: The last committed row `number` and the `imported` and
+        `rejected` counts, zeros if the checkpoint does not exist.
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'number': 0, 'imported': 0, 'rejected': 0}
+
+
+def write_checkpoint(path, checkpoint):
+    """Replace an import checkpoint atomically."""
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(temporary, path)
+
+
+def import_tasks(rows, chunk_size=None, checkpoint=None, on_rejects=None, on_chunk=None):
+    """
+    Validate and insert a stream of task rows, chunk by chunk.
+
+    Parameters:
+        rows (iterable): (row number, row dict) tuples, as from
+            task_manager.rows.parse_rows.
+        chunk_size (int, optional): The rows per chunk and transaction.
+        checkpoint (dict, optional): Resume after this checkpoint, as
+            returned by a previous import or read_checkpoint.
+        on_rejects (callable, optional): Called with the rejects of each
+            chunk, after the chunk is committed.
+        on_chunk (callable, optional): Called with the checkpoint after
+            each committed chunk.
+
+    Returns:
+        dict: The checkpoint of the finished import: the last row `number`
+        and the `imported` and `rejected` counts, including the rows
+        counted in the checkpoint resumed from.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    progress = dict(checkpoint or {'number': 0, 'imported': 0, 'rejected': 0})
+    rows = iter(rows)
+    if progress['number']:
+        rows = ((number, row) for number, row in rows if number > progress['number'])
+    resolver = AssigneeResolver()
+    written = False
+    while chunk := list(islice(rows, chunk_size)):
+        valid, rejects = validate_chunk(chunk, resolver)
+        if valid:
+            write_chunk(valid)
+            written = True
+        if rejects and on_rejects:
+            on_rejects(rejects)
+        progress['number'] = chunk[-1][0]
+        progress['imported'] += len(valid)
+        progress['rejected'] += len(rejects)
+        if on_chunk:
+            on_chunk(dict(progress))
+    if written:
+        publish_task_event('reload')
+    return progress
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""This module defines the import_tasks management command."""
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from task_manager.rows import FORMATS, guess_format, open_text, parse_rows
+from tasks.importer import import_tasks, read_checkpoint, write_checkpoint
+
+
+class Command(BaseCommand):
+    """
+    Import tasks from a CSV or NDJSON file.
+    """
+    help = 'Import tasks from a CSV or NDJSON file in validated, bulk-inserted chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The CSV or NDJSON file to import.')
+        parser.add_argument(
+            '--format', choices=FORMATS, default=None,
+            help='The file format (default: guessed from the extension).',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Rows validated and written per transaction.',
+        )
+        parser.add_argument(
+            '--rejects', default=None,
+            help='Write the rejected rows and their errors to this NDJSON file.',
+        )
+        parser.add_argument(
+            '--checkpoint', default=None,
+            help='Record the progress in this file after every chunk.',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Skip the rows already committed according to --checkpoint.',
+        )
+
+    def handle(self, *args, **options):
+        format = options['format'] or guess_format(options['path'])
+        if format is None:
+            raise CommandError('Cannot guess the file format; pass --format.')
+        if options['resume'] and not options['checkpoint']:
+            raise CommandError('--resume requires --checkpoint.')
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+
+        checkpoint = read_checkpoint(options['checkpoint']) if options['resume'] else None
+        rejects_file = None
+        if options['rejects']:
+            rejects_file = open(options['rejects'], 'a' if options['resume'] else 'w')
+
+        def on_rejects(rejects):
+            if rejects_file is not None:
+                rejects_file.writelines(json.dumps(reject) + '\n' for reject in rejects)
+                rejects_file.flush()
+
+        def on_chunk(progress):
+            if options['checkpoint']:
+                write_checkpoint(options['checkpoint'], progress)
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f"Row {progress['number']}: {progress['imported']} imported, "
+                    f"{progress['rejected']} rejected."
+                )
+
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as f:
+                result = import_tasks(
+                    parse_rows(open_text(f), format), chunk_size=options['chunk_size'],
+                    checkpoint=checkpoint, on_rejects=on_rejects, on_chunk=on_chunk,
+                )
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+        finally:
+            if rejects_file is not None:
+                rejects_file.close()
+        seconds = time.perf_counter() - started
+        rows = result['number'] - (checkpoint or {}).get('number', 0)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['imported']} tasks, rejected {result['rejected']} "
+            f"({rows / seconds if seconds else 0:.0f} rows/s)."
+        ))
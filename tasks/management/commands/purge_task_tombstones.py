@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""This module defines the purge_task_tombstones management command."""
+from django.core.management.base import BaseCommand
+from tasks.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Delete task tombstones older than TASKS_TOMBSTONE_RETENTION_DAYS.
+    """
+    help = 'Delete task tombstones older than the retention period.'
+
+    def handle(self, *args, **options):
+        purged = purge_tombstones()
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} task tombstones.'))
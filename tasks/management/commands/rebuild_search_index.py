@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""This module defines the rebuild_search_index management command."""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from tasks.search import is_search_supported, rebuild_search_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the task full-text search index from the tasks table.
+    """
+    help = 'Rebuild the full-text search index for tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='The database to rebuild the index in.',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not is_search_supported(using):
+            self.stdout.write('The database does not support the search index; nothing to do.')
+            return
+        with transaction.atomic(using=using):
+            count = rebuild_search_index(using=using)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} tasks.'))
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""This module defines the reconcile_task_counters management command."""
+from django.core.management.base import BaseCommand
+from tasks.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the task counters from the tasks table.
+    """
+    help = 'Rebuild the per-status/priority/category task counters.'
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled task counters ({drift} corrected).'))
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""This module defines the sweep_overdue_tasks management command."""
+from django.core.management.base import BaseCommand
+from tasks.sweeper import run_sweeps, sweep_overdue_tasks
+
+
+class Command(BaseCommand):
+    """
+    Mark 'In Progress' tasks past their due date as 'Overdue'.
+    """
+    help = "Mark 'In Progress' tasks past their due date as 'Overdue'."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Maximum number of rows updated per statement.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Keep running, sweeping every INTERVAL seconds.',
+        )
+
+    def handle(self, *args, **options):
+        if options['interval']:
+            run_sweeps(options['interval'], chunk_size=options['chunk_size'])
+            return
+        result = sweep_overdue_tasks(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Marked {result['rows']} tasks overdue in {result['seconds']:.3f}s "
+            f"({result['rows_per_sec']:.0f} rows/s)."
+        ))
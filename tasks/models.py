@@ -18,6 +18,7 @@ class Task(models.Model):
         due_date (datetime): The due date of the task.
         category (str): The category of the task.
         assigned_to (User): The user assigned to the task.
+        updated_at (datetime): When the task was last created or modified.
     """
     STATUS = [
         ('In Progress', 'In Progress'),
@@ -38,7 +39,62 @@ class Task(models.Model):
     due_date = models.DateTimeField()
     category = models.CharField(max_length=255)
     assigned_to = models.ForeignKey(User, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+            models.Index(fields=['assigned_to', 'status', 'due_date'], name='task_assignee_status_due_idx'),
+            models.Index(fields=['priority', 'due_date'], name='task_priority_due_idx'),
+            models.Index(fields=['due_date', 'id'], name='task_due_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='task_updated_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+
+
+class TaskCounter(models.Model):
+    """
+    Running count of tasks for one value of a counted field.
+
+    Counters are adjusted incrementally by the task services, so board
+    totals can be read without scanning the tasks table.
+
+    Attributes:
+        scope (str): 'all' for the whole organisation, or 'user:<id>' for
+            the tasks assigned to one user.
+        field (str): The counted Task field (status, priority or category).
+        value (str): The field value being counted.
+        count (int): The number of tasks with that value in the scope.
+    """
+    scope = models.CharField(max_length=32)
+    field = models.CharField(max_length=20)
+    value = models.CharField(max_length=255)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'field', 'value'], name='task_counter_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.scope} {self.field}={self.value}: {self.count}'
+
+
+class TaskTombstone(models.Model):
+    """
+    Records the deletion of a task so delta-sync clients can remove it.
+
+    Tombstones are kept for TASKS_TOMBSTONE_RETENTION_DAYS and then purged.
+
+    Attributes:
+        task_id (int): The id of the deleted task.
+        deleted_at (datetime): When the task was deleted.
+    """
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f'Task {self.task_id} deleted at {self.deleted_at}'
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""This module defines the keyset paginator for the tasks app."""
+import base64
+import json
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values):
+    """
+    Encode a list of JSON serializable values into an opaque cursor.
+
+    Parameters:
+        values (list): The values to encode.
+
+    Returns:
+        str: A URL safe cursor string.
+    """
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Parameters:
+        cursor (str): The opaque cursor string.
+
+    Returns:
+        list: The decoded values.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Malformed cursor') from e
+    if not isinstance(values, list):
+        raise ValueError('Malformed cursor')
+    return values
+
+
+class TaskKeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over tasks ordered by (due_date, id).
+
+    Each page is fetched with a `WHERE (due_date, id) > (last_due_date,
+    last_id)` condition instead of an OFFSET, so deep pages cost the same as
+    the first one. Pagination is enabled when the request carries a `cursor`
+    or `page_size` parameter; otherwise the full list is returned as before.
+    Pages are always ordered by (due_date, id), so `sort` cannot be combined
+    with them.
+
+    Attributes:
+        page_size (int): The default number of tasks per page.
+        max_page_size (int): The upper bound for the `page_size` parameter.
+    """
+    ordering = ('due_date', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = getattr(settings, 'TASKS_PAGE_SIZE', 50)
+    max_page_size = getattr(settings, 'TASKS_MAX_PAGE_SIZE', 500)
+    ordering_query_param = 'sort'
+    invalid_cursor_message = 'Invalid cursor'
+    sorted_pages_message = 'Cannot be combined with cursor or page_size; pages are ordered by due_date, id.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return a single page of tasks, or None if pagination is not requested.
+
+        Parameters:
+            queryset (QuerySet): The filtered task queryset.
+            request (Request): The HTTP request object.
+            view (APIView, optional): The view being paginated.
+
+        Returns:
+            list: The tasks of the requested page, or None.
+
+        Raises:
+            NotFound: If the cursor is malformed.
+        """
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request):
+        """
+        Asynchronous variant of paginate_queryset for the async views.
+
+        Parameters:
+            queryset (QuerySet): The filtered task queryset.
+            request (Request): The HTTP request object.
+
+        Returns:
+            list: The tasks of the requested page, or None.
+
+        Raises:
+            NotFound: If the cursor is malformed.
+        """
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.set_page([task async for task in page_queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Build the query of the requested page, with one extra row to detect
+        whether a next page exists.
+
+        Parameters:
+            queryset (QuerySet): The filtered task queryset.
+            request (Request): The HTTP request object.
+
+        Returns:
+            QuerySet: The sliced queryset, or None if pagination is not requested.
+
+        Raises:
+            NotFound: If the cursor is malformed.
+            ValidationError: If the request also asks for a `sort` order.
+        """
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        if params.get(self.ordering_query_param):
+            raise ValidationError({self.ordering_query_param: self.sorted_pages_message})
+
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = params.get(self.cursor_query_param)
+        if cursor:
+            due_date, pk = self.decode_position(cursor)
+            queryset = queryset.filter(
+                Q(due_date__gt=due_date) | Q(due_date=due_date, id__gt=pk)
+            )
+        return queryset[:self.page_size_value + 1]
+
+    def set_page(self, rows, position=None):
+        """
+        Trim the fetched rows to the page size and remember the next position.
+
+        Parameters:
+            rows (list): The tasks fetched by the page query.
+            position (callable, optional): Returns the (due_date, id) of a
+                row, for rows that are not Task instances.
+
+        Returns:
+            list: The tasks of the page.
+        """
+        self.has_next = len(rows) > self.page_size_value
+        page = rows[:self.page_size_value]
+        self.next_position = None
+        if self.has_next:
+            self.next_position = position(page[-1]) if position else (page[-1].due_date, page[-1].pk)
+        return page
+
+    def get_page_size(self, request):
+        """
+        Return the page size requested by the client, bounded by max_page_size.
+
+        Parameters:
+            request (Request): The HTTP request object.
+
+        Returns:
+            int: The page size to use.
+        """
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_position(self, cursor):
+        """
+        Decode a cursor into a (due_date, id) position.
+
+        Parameters:
+            cursor (str): The opaque cursor string.
+
+        Returns:
+            tuple: The due date and id of the last task on the previous page.
+
+        Raises:
+            NotFound: If the cursor is malformed.
+        """
+        try:
+            due_date, pk = decode_cursor(cursor)
+            due_date = parse_datetime(due_date)
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if due_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return due_date, pk
+
+    def get_next_link(self):
+        """
+        Build the URL of the next page.
+
+        Returns:
+            str: The absolute URL of the next page, or None on the last page.
+        """
+        if self.next_position is None:
+            return None
+        due_date, pk = self.next_position
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(
+            url, self.cursor_query_param, encode_cursor([due_date.isoformat(), pk])
+        )
+        return replace_query_param(url, self.page_size_query_param, self.page_size_value)
+
+    def get_paginated_response(self, data):
+        """
+        Wrap a page of serialized tasks with the link to the next page.
+
+        Parameters:
+            data (list): The serialized tasks of the page.
+
+        Returns:
+            Response: The paginated HTTP response.
+        """
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
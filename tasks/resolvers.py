@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+This module defines the batched foreign key resolution used by the tasks
+serializers.
+
+Validating an `assigned_to` id with a plain PrimaryKeyRelatedField runs one
+User query per task. The UserResolver instead collects every id referenced
+by a batch, loads them with a single `IN` query and keeps the result for
+the rest of the request.
+"""
+from django.contrib.auth.models import User
+
+RESOLVER_ATTR = '_task_user_resolver'
+
+
+class UserResolver:
+    """
+    Resolve user ids to User instances with one query per batch of ids.
+
+    Ids that do not exist are remembered too, so they are not queried again.
+    """
+
+    def __init__(self, queryset=None):
+        self.queryset = User.objects.all() if queryset is None else queryset
+        self._users = {}
+
+    def prefetch(self, ids):
+        """
+        Load every id not resolved yet with a single query.
+
+        Parameters:
+            ids (iterable): The user ids to resolve. Values that are not
+                valid integers are skipped.
+        """
+        missing = set()
+        for value in ids:
+            pk = to_pk(value)
+            if pk is not None and pk not in self._users:
+                missing.add(pk)
+        if not missing:
+            return
+        found = self.queryset.in_bulk(missing)
+        for pk in missing:
+            self._users[pk] = found.get(pk)
+
+    def get(self, pk):
+        """
+        Return the user with the given id, or None if it does not exist.
+
+        Parameters:
+            pk (int): The user id.
+
+        Returns:
+            User: The user, or None.
+        """
+        if pk not in self._users:
+            self.prefetch([pk])
+        return self._users.get(pk)
+
+
+def to_pk(value):
+    """
+    Convert a raw primary key value to an int.
+
+    Parameters:
+        value: The raw value, e.g. 3 or "3".
+
+    Returns:
+        int: The primary key, or None if the value is not a valid integer.
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_user_resolver(context):
+    """
+    Return the UserResolver shared by everything serialized for a request.
+
+    The resolver is stored on the request when the serializer context has
+    one, so all serializers of a request share its cache; otherwise it is
+    stored in the context itself.
+
+    Parameters:
+        context (dict): The serializer context.
+
+    Returns:
+        UserResolver: The resolver.
+    """
+    holder = context.get('request')
+    if holder is None:
+        return context.setdefault('user_resolver', UserResolver())
+    resolver = getattr(holder, RESOLVER_ATTR, None)
+    if resolver is None:
+        resolver = UserResolver()
+        setattr(holder, RESOLVER_ATTR, resolver)
+    return resolver
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+This module defines the full-text search index for tasks.
+
+On SQLite the index is an FTS5 virtual table whose rowid is the task id. It
+is kept in sync incrementally by the model signals in tasks.signals and can
+be rebuilt from scratch with the rebuild_search_index management command.
+On other databases the helpers fall back to matching title/description with
+icontains.
+"""
+import re
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from .models import Task
+
+SEARCH_TABLE = 'tasks_task_fts'
+
+# Relative bm25 weights of the indexed columns (title, description).
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _connection(using=None):
+    """Return the database connection tasks are written to."""
+    return connections[using or router.db_for_write(Task)]
+
+
+def is_search_supported(using=None):
+    """
+    Check whether the database backend supports the FTS5 search index.
+
+    Parameters:
+        using (str, optional): The database alias.
+
+    Returns:
+        bool: True if the search index can be used.
+    """
+    return _connection(using).vendor == 'sqlite'
+
+
+def build_match_query(query):
+    """
+    Turn free text into an FTS5 MATCH expression with prefix matching.
+
+    Every word of the query must match the start of a word in the title or
+    description, e.g. `fix log` becomes `"fix"* "log"*`.
+
+    Parameters:
+        query (str): The raw search text.
+
+    Returns:
+        str: The MATCH expression, or None if the query has no words.
+    """
+    tokens = TOKEN_RE.findall(query or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def ensure_search_index(using=None):
+    """
+    Create the FTS5 table if it does not exist yet.
+
+    Parameters:
+        using (str, optional): The database alias.
+    """
+    if not is_search_supported(using):
+        return
+    with _connection(using).cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "title, description, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+
+
+def index_tasks(tasks, using=None):
+    """
+    Add or refresh the index entries of the given tasks.
+
+    Parameters:
+        tasks (iterable): Task instances to index.
+        using (str, optional): The database alias.
+    """
+    if not is_search_supported(using):
+        return
+    index_rows([(task.pk, task.title, task.description) for task in tasks], using)
+
+
+def index_rows(rows, using=None):
+    """
+    Add or refresh index entries from (id, title, description) tuples.
+
+    Parameters:
+        rows (list): The tuples to index.
+        using (str, optional): The database alias.
+    """
+    if not rows or not is_search_supported(using):
+        return
+    with _connection(using).cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE}(rowid, title, description) "
+            "VALUES (%s, %s, %s)",
+            rows,
+        )
+
+
+def index_id_range(first_id, last_id, using=None):
+    """
+    Add the index entries of the tasks with ids in [first_id, last_id],
+    copied straight from the tasks table, e.g. after a bulk insert.
+
+    Parameters:
+        first_id (int): The first task id.
+        last_id (int): The last task id.
+        using (str, optional): The database alias.
+    """
+    if not is_search_supported(using):
+        return
+    with _connection(using).cursor() as cursor:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE}(rowid, title, description) "
+            f"SELECT id, title, description FROM {Task._meta.db_table} WHERE id BETWEEN %s AND %s",
+            [first_id, last_id],
+        )
+
+
+def remove_tasks(task_ids, using=None):
+    """
+    Remove the index entries of the given task ids.
+
+    Parameters:
+        task_ids (iterable): The ids of deleted tasks.
+        using (str, optional): The database alias.
+    """
+    if not is_search_supported(using):
+        return
+    rows = [(pk,) for pk in task_ids]
+    if not rows:
+        return
+    with _connection(using).cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", rows)
+
+
+def rebuild_search_index(using=None):
+    """
+    Drop every index entry and re-index all tasks in a single statement.
+
+    Parameters:
+        using (str, optional): The database alias.
+
+    Returns:
+        int: The number of indexed tasks.
+    """
+    if not is_search_supported(using):
+        return 0
+    ensure_search_index(using)
+    with _connection(using).cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, title, description) "
+            f"SELECT id, title, description FROM {Task._meta.db_table}"
+        )
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def filter_by_search(queryset, query):
+    """
+    Restrict a task queryset to the tasks matching the search text.
+
+    Parameters:
+        queryset (QuerySet): The task queryset to filter.
+        query (str): The raw search text.
+
+    Returns:
+        QuerySet: The filtered queryset.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return queryset
+    if not is_search_supported(queryset.db):
+        condition = Q()
+        for token in TOKEN_RE.findall(query):
+            condition &= Q(title__icontains=token) | Q(description__icontains=token)
+        return queryset.filter(condition)
+    return queryset.filter(pk__in=RawSQL(
+        f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match]
+    ))
+
+
+def search_tasks(query, limit, queryset=None):
+    """
+    Return the tasks best matching the search text, ranked by bm25.
+
+    Parameters:
+        query (str): The raw search text.
+        limit (int): The maximum number of tasks to return.
+        queryset (QuerySet, optional): The tasks eligible for the search.
+
+    Returns:
+        list: The matching Task instances, best match first.
+    """
+    queryset = Task.objects.all() if queryset is None else queryset
+    match = build_match_query(query)
+    if match is None:
+        return []
+    if not is_search_supported(queryset.db):
+        return list(filter_by_search(queryset, query).order_by('due_date', 'id')[:limit])
+
+    # Restrict the matches to the queryset before ranking and limiting, so
+    # that filtered-out tasks never take up places in the result.
+    eligible, params = queryset.order_by().values('pk').query.sql_with_params()
+    with _connection(queryset.db).cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+            f"AND rowid IN ({eligible}) "
+            f"ORDER BY bm25({SEARCH_TABLE}, %s, %s) LIMIT %s",
+            [match, *params, TITLE_WEIGHT, DESCRIPTION_WEIGHT, limit],
+        )
+        ranked_ids = [row[0] for row in cursor.fetchall()]
+    tasks = queryset.in_bulk(ranked_ids)
+    return [tasks[pk] for pk in ranked_ids if pk in tasks]
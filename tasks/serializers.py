@@ -2,7 +2,57 @@
 """This module defines the TaskSerializer class."""
 from rest_framework import serializers
 from .models import Task
+from .resolvers import get_user_resolver, to_pk
 from django.contrib.auth.models import User
+from task_manager.metrics import track_serializer_time
+
+
+class ResolvedUserField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field for the assigned user that looks ids up through the
+    request's UserResolver instead of running one query per value.
+    """
+
+    def to_internal_value(self, data):
+        pk = to_pk(data)
+        if pk is None:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        user = get_user_resolver(self.context).get(pk)
+        if user is None:
+            self.fail('does_not_exist', pk_value=data)
+        return user
+
+
+class TaskListSerializer(serializers.ListSerializer):
+    """
+    List serializer used when validating many tasks at once.
+
+    Every `assigned_to` id of the batch is resolved with a single query
+    before the items are validated. When a `tasks` dict (id -> Task) is
+    provided in the context, each item is validated against the task
+    matching its `id`, which is how bulk partial updates are validated.
+    """
+
+    @property
+    def data(self):
+        with track_serializer_time():
+            return super().data
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            get_user_resolver(self.context).prefetch(
+                item.get('assigned_to') for item in data if isinstance(item, dict)
+            )
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        tasks = self.context.get('tasks')
+        if tasks is not None:
+            task = tasks.get(to_pk(data.get('id'))) if isinstance(data, dict) else None
+            if task is None:
+                raise serializers.ValidationError({'id': ['Task not found.']})
+            self.child.instance = task
+        return super().run_child_validation(data)
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -12,10 +62,10 @@ class TaskSerializer(serializers.ModelSerializer):
     This serializer maps the Task model to JSON format.
 
     Attributes:
-        assigned_to (PrimaryKeyRelatedField): The user assigned to the task.
+        assigned_to (ResolvedUserField): The user assigned to the task.
 
     """
-    assigned_to = serializers.PrimaryKeyRelatedField(
+    assigned_to = ResolvedUserField(
         queryset=User.objects.all(), 
         error_messages={'incorrect_type': 'Please select a valid user ID.'}
     )
@@ -23,3 +73,9 @@ class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = '__all__'
+        list_serializer_class = TaskListSerializer
+
+    @property
+    def data(self):
+        with track_serializer_time():
+            return super().data
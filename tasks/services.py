@@ -1,44 +1,80 @@
 #!/usr/bin/env python3
 """This module defines the helper functions for the task app"""
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from .models import Task
 from .serializers import TaskSerializer
+from .resolvers import to_pk
+from .cache import invalidate_task_cache
+from .search import index_tasks
+from .counters import apply_deltas, delta_users, grouped_deltas, snapshot, task_deltas
+from .events import publish_task_event
+from .signals import deletions_recorded
+from .sync import record_deletions
 from rest_framework.exceptions import ValidationError
 
-def create_task(request_data):
+def create_task(request_data, context=None):
     """
     Create a task based on the provided request data.
 
     Parameters:
         request_data (dict): The request data containing task details.
+        context (dict, optional): The serializer context, e.g. the request.
 
     Returns:
         TaskSerializer: The serializer containing the created task.
     """
-    serializer = TaskSerializer(data=request_data)
+    serializer = TaskSerializer(data=request_data, context=context or {})
     if serializer.is_valid(raise_exception=True):
-        serializer.save()
+        with transaction.atomic():
+            task = serializer.save()
+            deltas = task_deltas(task)
+            apply_deltas(deltas)
+            invalidate_task_cache(delta_users(deltas))
+            publish_task_event('created', task.pk, serializer.data)
         return serializer
     else:
         raise ValidationError(serializer.errors)
 
-def update_task(task, request_data):
+def update_task(task, request_data, context=None):
     """
     Update a task based on the provided request data.
 
     Parameters:
         task (Task): The task instance to update.
         request_data (dict): The request data containing task details.
+        context (dict, optional): The serializer context, e.g. the request.
 
     Returns:
         TaskSerializer: The serializer containing the updated task.
     """
-    serializer = TaskSerializer(task, data=request_data, partial=True)
+    serializer = TaskSerializer(task, data=request_data, partial=True, context=context or {})
     if serializer.is_valid(raise_exception=True):
-        serializer.save()
+        before = snapshot(task)
+        with transaction.atomic():
+            task = serializer.save()
+            deltas = task_deltas(task, deltas=task_deltas(before, sign=-1))
+            apply_deltas(deltas)
+            invalidate_task_cache(delta_users(deltas))
+            publish_task_event('updated', task.pk, serializer.data)
         return serializer
     else:
         raise ValidationError(serializer.errors)
 
+def delete_task(task):
+    """
+    Delete a task.
+
+    Parameters:
+        task (Task): The task instance to delete.
+    """
+    # The tombstone, counters, cache and event are recorded by the
+    # post_delete receiver, as for any other delete.
+    with transaction.atomic():
+        task.delete()
+
 def get_tasks_by_status(status):
     """
     Retrieve tasks by their status.
@@ -50,3 +86,154 @@ def get_tasks_by_status(status):
         QuerySet: A queryset of tasks filtered by the given status.
     """
     return Task.objects.filter(status=status)
+
+def _bulk_batch_size():
+    """Return the number of rows written per bulk INSERT/UPDATE statement."""
+    return getattr(settings, 'TASKS_BULK_BATCH_SIZE', 500)
+
+def _check_bulk_items(items):
+    """
+    Check that a bulk payload is a list within the configured size limit.
+
+    Raises:
+        ValidationError: If the payload is not a list or is too large.
+    """
+    max_items = getattr(settings, 'TASKS_BULK_MAX_ITEMS', 10000)
+    if not isinstance(items, list):
+        raise ValidationError({'non_field_errors': ['Expected a list of items.']})
+    if len(items) > max_items:
+        raise ValidationError(
+            {'non_field_errors': [f'Ensure there are no more than {max_items} items.']}
+        )
+
+def bulk_create_tasks(items, context=None):
+    """
+    Validate and create many tasks in a single transaction.
+
+    Every item is validated before anything is written, the assigned users
+    are resolved with a single query and rows are inserted with bulk_create.
+    Nothing is written if any item is invalid.
+
+    Parameters:
+        items (list): The task dicts to create.
+        context (dict, optional): The serializer context, e.g. the request.
+
+    Returns:
+        list: The created Task instances, in input order.
+
+    Raises:
+        ValidationError: If any item is invalid. Its `errors` list holds the
+            errors of each item, in input order ({} for valid items).
+    """
+    _check_bulk_items(items)
+    serializer = TaskSerializer(data=items, many=True, context=context or {})
+    if not serializer.is_valid():
+        raise ValidationError({'errors': serializer.errors})
+
+    tasks = [Task(**data) for data in serializer.validated_data]
+    with transaction.atomic():
+        tasks = Task.objects.bulk_create(tasks, batch_size=_bulk_batch_size())
+        index_tasks(tasks)
+        deltas = Counter()
+        for task in tasks:
+            task_deltas(task, deltas=deltas)
+        apply_deltas(deltas)
+        invalidate_task_cache(delta_users(deltas))
+        publish_task_event('reload')
+    return tasks
+
+def bulk_update_tasks(items, context=None):
+    """
+    Validate and partially update many tasks in a single transaction.
+
+    Each item must carry the `id` of the task to update plus the fields to
+    change. Tasks and assigned users are each loaded with one query, and
+    rows are written with bulk_update. Nothing is written if any item is
+    invalid.
+
+    Parameters:
+        items (list): The task dicts to apply.
+        context (dict, optional): The serializer context, e.g. the request.
+
+    Returns:
+        list: The updated Task instances, in input order.
+
+    Raises:
+        ValidationError: If any item is invalid. Its `errors` list holds the
+            errors of each item, in input order ({} for valid items).
+    """
+    _check_bulk_items(items)
+    ids = {to_pk(item.get('id')) for item in items if isinstance(item, dict)}
+    task_map = Task.objects.in_bulk(ids - {None})
+    serializer = TaskSerializer(
+        data=items, many=True, partial=True,
+        context={**(context or {}), 'tasks': task_map},
+    )
+    if not serializer.is_valid():
+        raise ValidationError({'errors': serializer.errors})
+
+    tasks = []
+    fields = set()
+    deltas = Counter()
+    for item, data in zip(items, serializer.validated_data):
+        task = task_map[to_pk(item['id'])]
+        task_deltas(snapshot(task), sign=-1, deltas=deltas)
+        for field, value in data.items():
+            setattr(task, field, value)
+        fields.update(data)
+        task_deltas(task, deltas=deltas)
+        tasks.append(task)
+
+    with transaction.atomic():
+        if fields:
+            # bulk_update does not apply auto_now, so stamp updated_at here.
+            now = timezone.now()
+            for task in tasks:
+                task.updated_at = now
+            fields.add('updated_at')
+            Task.objects.bulk_update(tasks, sorted(fields), batch_size=_bulk_batch_size())
+        if fields & {'title', 'description'}:
+            index_tasks(tasks)
+        apply_deltas(deltas)
+        invalidate_task_cache(delta_users(deltas))
+        publish_task_event('reload')
+    return tasks
+
+def bulk_delete_tasks(ids):
+    """
+    Delete many tasks in a single transaction.
+
+    Nothing is deleted if any id does not match an existing task.
+
+    Parameters:
+        ids (list): The ids of the tasks to delete.
+
+    Returns:
+        int: The number of deleted tasks.
+
+    Raises:
+        ValidationError: If any id is invalid. Its `errors` list holds the
+            errors of each id, in input order ({} for valid ids).
+    """
+    _check_bulk_items(ids)
+    pks = [to_pk(value) for value in ids]
+    existing = set(Task.objects.filter(pk__in=[pk for pk in pks if pk is not None])
+                   .values_list('pk', flat=True))
+    errors = [
+        {} if pk in existing
+        else {'id': ['A valid integer is required.']} if pk is None
+        else {'id': ['Task not found.']}
+        for pk in pks
+    ]
+    if any(errors):
+        raise ValidationError({'errors': errors})
+
+    with transaction.atomic(), deletions_recorded():
+        tasks = Task.objects.filter(pk__in=existing)
+        deltas = grouped_deltas(tasks, sign=-1)
+        tasks.delete()
+        record_deletions(existing)
+        apply_deltas(deltas)
+        invalidate_task_cache(delta_users(deltas))
+        publish_task_event('reload')
+    return len(existing)
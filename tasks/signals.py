@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""This module defines the signal handlers for the tasks app."""
+import threading
+from contextlib import contextmanager
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import invalidate_task_cache
+from .counters import apply_deltas, delta_users, task_deltas
+from .events import publish_task_event
+from .models import Task
+from .search import ensure_search_index, index_tasks, remove_tasks
+from .sync import record_deletions
+
+_recorded = threading.local()
+
+
+@receiver(post_save, sender=Task)
+def index_saved_task(sender, instance, using, **kwargs):
+    """
+    Keep the search index entry of a task in sync after it is saved.
+    """
+    index_tasks([instance], using=using)
+
+
+@receiver(post_delete, sender=Task)
+def unindex_deleted_task(sender, instance, using, **kwargs):
+    """
+    Remove the search index entry of a task after it is deleted.
+    """
+    remove_tasks([instance.pk], using=using)
+
+
+@contextmanager
+def deletions_recorded():
+    """
+    Skip the per-task bookkeeping of record_deleted_task for deletions
+    whose tombstones, counters, cache and event the caller records itself,
+    in bulk.
+    """
+    _recorded.depth = getattr(_recorded, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _recorded.depth -= 1
+
+
+@receiver(post_delete, sender=Task)
+def record_deleted_task(sender, instance, **kwargs):
+    """
+    Record the tombstone and counter deltas of a deleted task, invalidate
+    the cached task responses and publish a `deleted` event.
+
+    This covers every ORM delete, including the cascade from a deleted
+    user, queryset and admin deletes, not only the task services.
+    """
+    if getattr(_recorded, 'depth', 0):
+        return
+    record_deletions([instance.pk])
+    deltas = task_deltas(instance, sign=-1)
+    apply_deltas(deltas)
+    invalidate_task_cache(delta_users(deltas))
+    publish_task_event('deleted', instance.pk)
+
+
+def create_search_index(sender, using, **kwargs):
+    """
+    Create the search index table once the tasks tables exist.
+
+    Connected to post_migrate in TasksConfig.ready.
+    """
+    ensure_search_index(using=using)
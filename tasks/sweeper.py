@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+This module defines the overdue-status sweeper for the tasks app.
+
+The sweeper moves 'In Progress' tasks whose due date has passed to
+'Overdue'. Each chunk is a single `UPDATE ... WHERE id IN (SELECT id ...
+ORDER BY due_date, id LIMIT n)` driven by the (status, due_date) index, so
+rows are never loaded into Python and each transaction stays short. The
+chunk's counter deltas are grouped in SQL from the same subquery, earlier
+in the same transaction.
+
+The sweep runs from the sweep_overdue_tasks command, once from cron or
+repeatedly with --interval in a dedicated process; application processes
+never start it.
+"""
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Subquery
+from django.utils import timezone
+from .cache import invalidate_task_cache
+from .counters import apply_deltas, delta_users, grouped_deltas
+from .events import publish_task_event
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_overdue_tasks(now=None, chunk_size=None):
+    """
+    Mark every 'In Progress' task past its due date as 'Overdue'.
+
+    Parameters:
+        now (datetime, optional): The reference time. Defaults to now.
+        chunk_size (int, optional): The maximum number of rows updated per
+            statement. Defaults to TASKS_OVERDUE_SWEEP_CHUNK_SIZE.
+
+    Returns:
+        dict: The number of updated rows, the elapsed seconds and the
+        throughput in rows per second.
+    """
+    now = now or timezone.now()
+    chunk_size = chunk_size or getattr(settings, 'TASKS_OVERDUE_SWEEP_CHUNK_SIZE', 5000)
+    started = time.perf_counter()
+    total = 0
+    while True:
+        with transaction.atomic():
+            # FOR UPDATE (where supported) locks the chunk at the first
+            # statement, and SQLite keeps one snapshot for the transaction,
+            # so the counts and the update select the same rows.
+            chunk = (
+                Task.objects.filter(status='In Progress', due_date__lt=now)
+                .select_for_update().order_by('due_date', 'id').values('pk')[:chunk_size]
+            )
+            tasks = Task.objects.filter(pk__in=Subquery(chunk))
+            # Computed in SQL before the update: remove the chunk's counts
+            # and add them back under the new status.
+            deltas = grouped_deltas(tasks, sign=-1)
+            for (scope, field, value), delta in list(deltas.items()):
+                if field == 'status':
+                    deltas[(scope, field, 'Overdue')] -= delta
+                else:
+                    del deltas[(scope, field, value)]
+            updated = tasks.update(status='Overdue', updated_at=timezone.now())
+            if updated:
+                apply_deltas(deltas)
+                invalidate_task_cache(delta_users(deltas))
+                publish_task_event('reload')
+        total += updated
+        if updated < chunk_size:
+            break
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': total,
+        'seconds': elapsed,
+        'rows_per_sec': total / elapsed if elapsed else 0.0,
+    }
+
+
+def run_sweeps(interval, chunk_size=None, stopped=None):
+    """
+    Run the overdue sweep every `interval` seconds until stopped.
+
+    Parameters:
+        interval (float): Seconds between sweeps.
+        chunk_size (int, optional): The maximum number of rows updated per
+            statement.
+        stopped (threading.Event, optional): Stops the loop once set.
+    """
+    stopped = stopped or threading.Event()
+    while not stopped.wait(interval):
+        try:
+            close_old_connections()
+            result = sweep_overdue_tasks(chunk_size=chunk_size)
+            if result['rows']:
+                logger.info(
+                    'Marked %d tasks overdue in %.3fs (%.0f rows/s)',
+                    result['rows'], result['seconds'], result['rows_per_sec'],
+                )
+        except Exception:
+            logger.exception('Overdue sweep failed')
+        finally:
+            close_old_connections()
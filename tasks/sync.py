@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+This module defines the delta sync ("tasks changed since token") support.
+
+A sync token encodes the (updated_at, id) of the last task change a client
+has seen, the id of the last tombstone it has seen and when the token was
+issued. Changes are read with a keyset condition on the (updated_at, id)
+index, so a sync costs O(changes) rather than O(table).
+
+Writes that commit out of timestamp order could slip behind a token, so
+tokens never point past `now - TASKS_CHANGES_SETTLE_SECONDS`: changes in
+that window are sent again on the next sync, which clients apply
+idempotently.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Task, TaskTombstone
+from .pagination import decode_cursor, encode_cursor
+
+
+class InvalidToken(ValueError):
+    """Raised when a sync token is malformed."""
+
+
+class ExpiredToken(ValueError):
+    """Raised when a sync token is older than the tombstone retention."""
+
+
+def _settle_cutoff(now):
+    return now - timedelta(seconds=getattr(settings, 'TASKS_CHANGES_SETTLE_SECONDS', 2))
+
+
+def _retention():
+    return timedelta(days=getattr(settings, 'TASKS_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def decode_token(token):
+    """
+    Decode a sync token.
+
+    Parameters:
+        token (str): The opaque token.
+
+    Returns:
+        tuple: (updated_at, task id, tombstone id, issued_at).
+
+    Raises:
+        InvalidToken: If the token is malformed.
+        ExpiredToken: If tombstones the client needs may have been purged.
+    """
+    try:
+        updated_at, task_id, tombstone_id, issued_at = decode_cursor(token)
+        updated_at = parse_datetime(updated_at) if updated_at else None
+        issued_at = parse_datetime(issued_at)
+        task_id, tombstone_id = int(task_id), int(tombstone_id)
+    except (TypeError, ValueError):
+        raise InvalidToken('Invalid sync token.')
+    if issued_at is None:
+        raise InvalidToken('Invalid sync token.')
+    if issued_at < timezone.now() - _retention():
+        raise ExpiredToken('Sync token expired; perform a full sync.')
+    return updated_at, task_id, tombstone_id, issued_at
+
+
+def get_changes(token=None, limit=500, queryset=None):
+    """
+    Return the tasks changed and deleted since a sync token.
+
+    Without a token every task is returned (in pages) and deletions that
+    happened before are skipped, which is a full sync.
+
+    Parameters:
+        token (str, optional): The token returned by the previous sync.
+        limit (int): The maximum number of changed tasks and of deleted ids.
+        queryset (QuerySet, optional): The tasks visible to the client.
+
+    Returns:
+        dict: `changed` (list of Task), `deleted` (list of ids), `more`
+        (bool, whether another call would return more changes) and `next`
+        (the token to send next time).
+
+    Raises:
+        InvalidToken: If the token is malformed.
+        ExpiredToken: If the token is older than the tombstone retention.
+    """
+    queryset = Task.objects.all() if queryset is None else queryset
+    now = timezone.now()
+    cutoff = _settle_cutoff(now)
+
+    if token:
+        updated_at, task_id, tombstone_id, _ = decode_token(token)
+    else:
+        updated_at, task_id = None, 0
+        tombstone_id = TaskTombstone.objects.filter(deleted_at__lte=cutoff).aggregate(
+            last=Max('id'))['last'] or 0
+
+    tasks = queryset.order_by('updated_at', 'id')
+    if updated_at is not None:
+        tasks = tasks.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=task_id))
+    changed = list(tasks[:limit + 1])
+    tombstones = list(
+        TaskTombstone.objects.filter(id__gt=tombstone_id).order_by('id')
+        .values_list('id', 'task_id', 'deleted_at')[:limit + 1]
+    )
+    tasks_left = len(changed) > limit
+    tombstones_left = len(tombstones) > limit
+    changed, tombstones = changed[:limit], tombstones[:limit]
+
+    # Advance the cursors, but never past the settle window. Anything
+    # past it is returned again next time.
+    for task in changed:
+        if task.updated_at > cutoff:
+            tasks_left = False
+            break
+        updated_at, task_id = task.updated_at, task.pk
+    for pk, _, deleted_at in tombstones:
+        if deleted_at > cutoff:
+            tombstones_left = False
+            break
+        tombstone_id = pk
+
+    next_token = encode_cursor([
+        updated_at.isoformat() if updated_at else None, task_id, tombstone_id, now.isoformat(),
+    ])
+    return {
+        'changed': changed,
+        'deleted': [deleted_task_id for _, deleted_task_id, _ in tombstones],
+        'more': tasks_left or tombstones_left,
+        'next': next_token,
+    }
+
+
+def record_deletions(task_ids):
+    """
+    Record tombstones for deleted tasks.
+
+    Parameters:
+        task_ids (iterable): The ids of the deleted tasks.
+    """
+    TaskTombstone.objects.bulk_create([TaskTombstone(task_id=pk) for pk in task_ids])
+
+
+def purge_tombstones(now=None):
+    """
+    Delete tombstones older than the retention period.
+
+    Parameters:
+        now (datetime, optional): The reference time. Defaults to now.
+
+    Returns:
+        int: The number of purged tombstones.
+    """
+    now = now or timezone.now()
+    deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=now - _retention()).delete()
+    return deleted
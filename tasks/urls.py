@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 """This module defines the urls for the tasks app."""
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet, index
+from .views import TaskViewSet, index, task_events
+from . import async_views
 
 
 app_name = 'tasks'
@@ -10,7 +12,16 @@ app_name = 'tasks'
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet)
 
+# The async views take over the list and detail routes of the router when
+# ASYNC_API_VIEWS is enabled; the other actions are always served by DRF.
+async_urlpatterns = [
+    path('tasks/', async_views.task_list, name='task-list-async'),
+    path('tasks/<int:pk>/', async_views.task_detail, name='task-detail-async'),
+]
+
 urlpatterns = [
+    path('tasks/events/', task_events, name='task-events'),
+    *(async_urlpatterns if settings.ASYNC_API_VIEWS else []),
     path('', include(router.urls)),
     path('index/', index, name='index'),
 ]
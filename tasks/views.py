@@ -1,16 +1,38 @@
 #!/usr/bin/env python3
 """This module defines the TaskViewSet class."""
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework import viewsets
 from .models import Task
+from .filters import TaskFilterBackend, TaskOrderingFilter, TaskSearchFilter
+from .pagination import TaskKeysetPagination
+from .search import search_tasks
+from .counters import SCOPE_ALL, get_counts, user_scope
+from .conditional import conditional_response, make_etag
+from .resolvers import to_pk
+from .events import event_stream
+from .sync import ExpiredToken, InvalidToken, get_changes
 from .serializers import TaskSerializer
-from .services import get_tasks_by_status, create_task, update_task
+from .services import (
+    get_tasks_by_status, create_task, update_task, delete_task,
+    bulk_create_tasks, bulk_update_tasks, bulk_delete_tasks,
+)
+from .cache import cached_response, get_cache_stats, get_collection_version
+from .export import CSVRenderer, NDJSONRenderer, export_rows
+from .representation import PROJECTIONS, FastJSONRenderer, get_task_plan
+from .importer import import_tasks
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework import status
+from django.conf import settings
 from django.shortcuts import render
+from django.http import JsonResponse, StreamingHttpResponse
+from task_manager.routers import bind_read_alias
+from task_manager.rows import FORMATS, guess_format, open_text, parse_rows
+from users.authentication import CachedTokenAuthentication, aauthenticate, get_token_cache_stats
+from functools import partial
 
 
 def index(request):
@@ -27,14 +49,189 @@ def index(request):
     return render(request, 'tasks/index.html')
 
 
+async def task_events(request):
+    """
+    Stream task changes to the client as server-sent events.
+
+    The client is authenticated with an `Authorization: Token <key>` header
+    or with its session. Each create, update and delete is sent as a
+    `created`, `updated` or `deleted` event whose data is JSON with the
+    task id (and the serialized task for created/updated). A `reload`
+    event asks the client to refetch the board. This view is asynchronous
+    and must be served through the ASGI application.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        StreamingHttpResponse: The never-ending event stream, or a 401
+        JsonResponse if the client is not authenticated.
+    """
+    if await aauthenticate(request) is None:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    return StreamingHttpResponse(
+        event_stream(),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
 class TaskViewSet(viewsets.ModelViewSet):
     """
     A viewset for viewing and editing task instances.
     """
     serializer_class = TaskSerializer
     queryset = Task.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    pagination_class = TaskKeysetPagination
+    filter_backends = [TaskFilterBackend, TaskSearchFilter, TaskOrderingFilter]
+    ordering_fields = ['due_date', 'priority', 'status', 'category', 'title', 'id']
+    ordering = ['due_date', 'id']
+    search_limit = 20
+    max_search_limit = 100
+    changes_limit = 500
+    max_changes_limit = 5000
+
+    def list(self, request, *args, **kwargs):
+        """
+        List tasks, serving repeated requests from the response cache.
+
+        Returns 304 Not Modified without serializing anything when the
+        client's ETag matches the cache version of the collection.
+
+        Parameters:
+            request (Request): The HTTP request object.
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+
+        Returns:
+            Response: The HTTP response containing the serialized tasks.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        assignee = TaskFilterBackend.get_assignee(request)
+        build = partial(
+            cached_response, request, partial(self.list_response, queryset, self.get_row_plan()),
+            assignee=assignee,
+        )
+        return self.conditional_collection_response(assignee, build)
+
+    def get_row_plan(self):
+        """
+        Compile the row plan of a task list request.
+
+        Supported parameters:
+            view (str): A named projection, e.g. `board`, which selects the
+                fields the board shows and truncates descriptions.
+            fields (str): Comma separated fields to return.
+            omit (str): Comma separated fields to leave out.
+
+        Only the selected fields are read from the database.
+
+        Returns:
+            TaskRowPlan: The plan of the requested fields.
+
+        Raises:
+            ValidationError: If a view or field name is unknown.
+        """
+        params = self.request.query_params
+        known = get_task_plan().keys
+        fields, truncate = None, None
+        if params.get('view'):
+            projection = PROJECTIONS.get(params['view'])
+            if projection is None:
+                raise ValidationError({'view': f'Unknown view. Use one of: {", ".join(PROJECTIONS)}.'})
+            fields = projection['fields']
+            truncate = {
+                field: getattr(settings, setting, default)
+                for field, (setting, default) in projection['truncate'].items()
+            }
+        for param in ('fields', 'omit'):
+            if not params.get(param):
+                continue
+            names = {name.strip() for name in params[param].split(',') if name.strip()}
+            unknown = names.difference(known)
+            if unknown:
+                raise ValidationError({param: f'Unknown fields: {", ".join(sorted(unknown))}.'})
+            fields = [name for name in fields or known if (name in names) == (param == 'fields')]
+        return get_task_plan(fields, truncate)
+
+    def list_response(self, queryset, plan):
+        """
+        Serialize a filtered task list through the compiled read path,
+        paginating it when requested.
+
+        Parameters:
+            queryset (QuerySet): The filtered tasks.
+            plan (TaskRowPlan): The plan of the requested fields.
+
+        Returns:
+            Response: The same response as serializing the tasks with
+            TaskSerializer, restricted to the plan's fields.
+        """
+        page_queryset = self.paginator.get_page_queryset(queryset, self.request)
+        if page_queryset is None:
+            return Response(plan.serialize(queryset))
+        page = self.paginator.set_page(plan.fetch(page_queryset), position=plan.position)
+        return self.get_paginated_response(plan.represent(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve a task, serving repeated requests from the response cache.
+
+        Returns 304 Not Modified when the client's ETag matches the task's
+        current version.
+
+        Parameters:
+            request (Request): The HTTP request object.
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+
+        Returns:
+            Response: The HTTP response containing the serialized task.
+        """
+        build = partial(cached_response, request, partial(super().retrieve, request, *args, **kwargs))
+        pk = to_pk(kwargs.get(self.lookup_field))
+        updated_at = None
+        if pk is not None:
+            updated_at = self.get_queryset().filter(pk=pk).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return build()
+        etag = make_etag(request.get_full_path(), request.user.pk, updated_at.isoformat())
+        return conditional_response(request, etag, updated_at, build)
+
+    def conditional_collection_response(self, assignee, build_response):
+        """
+        Return 304 if the client's copy of a task collection is current.
+
+        The ETag is derived from the response cache version, so validating
+        costs no query. Collections carry no Last-Modified: deletes do not
+        move any remaining task's updated_at, so If-Modified-Since alone
+        could wrongly return 304.
+
+        Parameters:
+            assignee (int): The user the collection is restricted to, or None.
+            build_response (callable): Builds the full response.
+
+        Returns:
+            Response: The 304 or the full response, with an ETag.
+        """
+        request = self.request
+        etag = make_etag(request.get_full_path(), request.user.pk, get_collection_version(assignee))
+        return conditional_response(request, etag, None, build_response)
+
+    def perform_destroy(self, instance):
+        """
+        Delete a task instance through the task services.
+
+        Parameters:
+            instance (Task): The task to delete.
+        """
+        delete_task(instance)
 
     def create(self, request, *args, **kwargs):
         """
@@ -53,7 +250,7 @@ class TaskViewSet(viewsets.ModelViewSet):
             Exception: If an internal server error occurs.
         """
         try:
-            serializer = create_task(request.data)
+            serializer = create_task(request.data, self.get_serializer_context())
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         except ValidationError as ve:
             return Response(ve.detail, status=status.HTTP_400_BAD_REQUEST)
@@ -81,7 +278,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         """
         try:
             task = self.get_object()
-            serializer = update_task(task, request.data)
+            serializer = update_task(task, request.data, self.get_serializer_context())
             return Response(serializer.data)
         except ValidationError as ve:
             return Response(ve.detail, status=status.HTTP_400_BAD_REQUEST)
@@ -105,14 +302,247 @@ class TaskViewSet(viewsets.ModelViewSet):
             Response: The HTTP response containing the serialized task data.
 
         Raises:
+            ValidationError: If a filter query parameter is invalid.
+            NotFound: If the pagination cursor is invalid.
             Exception: If an internal server error occurs.
         """
         try:
-            tasks = get_tasks_by_status(status)
-            serializer = self.get_serializer(tasks, many=True)
-            return Response(serializer.data)
+            tasks = self.filter_queryset(get_tasks_by_status(status))
+            assignee = TaskFilterBackend.get_assignee(request)
+            build = partial(
+                cached_response, request, partial(self.list_response, tasks, self.get_row_plan()),
+                assignee=assignee,
+            )
+            return self.conditional_collection_response(assignee, build)
+        except (ValidationError, NotFound):
+            raise
         except Exception:
             return Response(
                 {"error": "Internal server error"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Stream every task matching the list filters as NDJSON or CSV.
+
+        The format is chosen with `?format=ndjson` (the default) or
+        `?format=csv`, or with the Accept header. Rows are read and sent in
+        chunks of TASKS_EXPORT_CHUNK_SIZE, so memory use does not grow with
+        the number of tasks. Each row holds the task fields plus the
+        assignee's `assigned_to_username`.
+
+        Parameters:
+            self: The TaskViewSet instance.
+            request (Request): The HTTP request object. Supports the list
+                filter, `search` and `sort` query parameters.
+
+        Returns:
+            StreamingHttpResponse: The streamed export, as an attachment.
+        """
+        renderer = request.accepted_renderer
+        tasks = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            bind_read_alias(renderer.stream(export_rows(tasks))),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+            headers={'Content-Disposition': f'attachment; filename="tasks.{renderer.format}"'},
+        )
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import',
+            parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        """
+        Import tasks from an uploaded CSV or NDJSON file.
+
+        The file is sent as the `file` field of a multipart form. Its format
+        is taken from the `format` field, or else from the file extension.
+        Rows are validated and inserted in chunks; invalid rows are skipped
+        and reported instead of failing the import.
+
+        Parameters:
+            self: The TaskViewSet instance.
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The `imported` and `rejected` counts and the first
+            TASKS_IMPORT_MAX_REPORTED_REJECTS `rejects`, each with the row
+            `number`, the raw `row` and its `errors`. 400 if the file is
+            missing or its format unknown.
+
+        Example:
+            {
+                "imported": 2,
+                "rejected": 1,
+                "rejects": [{"number": 2, "row": {...}, "errors": {"status": [...]}}]
+            }
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['No file was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+        format = request.data.get('format') or guess_format(upload.name)
+        if format not in FORMATS:
+            return Response(
+                {'format': [f'Expected one of: {", ".join(FORMATS)}.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        max_reported = getattr(settings, 'TASKS_IMPORT_MAX_REPORTED_REJECTS', 100)
+        reported = []
+
+        def on_rejects(rejects):
+            reported.extend(rejects[:max_reported - len(reported)])
+
+        result = import_tasks(parse_rows(open_text(upload), format), on_rejects=on_rejects)
+        return Response({
+            'imported': result['imported'],
+            'rejected': result['rejected'],
+            'rejects': reported,
+        })
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Search tasks by title and description, best matches first.
+
+        Every word of the `q` parameter is matched as a prefix, so partial
+        words typed into the search box already return results.
+
+        Parameters:
+            self: The TaskViewSet instance.
+            request (Request): The HTTP request object. Supports the `q`
+                and `limit` query parameters.
+
+        Returns:
+            Response: The HTTP response containing the ranked serialized tasks.
+        """
+        try:
+            limit = int(request.query_params.get('limit', self.search_limit))
+        except ValueError:
+            limit = self.search_limit
+        limit = max(1, min(limit, self.max_search_limit))
+        tasks = search_tasks(request.query_params.get('q', ''), limit, self.get_queryset())
+        serializer = self.get_serializer(tasks, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'])
+    def bulk(self, request):
+        """
+        Create, update or delete many tasks in one request.
+
+        - POST: a list of task objects to create.
+        - PATCH: a list of partial task objects, each with the `id` of the
+          task to update.
+        - DELETE: `{"ids": [...]}` with the ids of the tasks to delete.
+
+        All items are validated before anything is written and the writes
+        happen in one transaction, so either every item is applied or none.
+
+        Parameters:
+            self: The TaskViewSet instance.
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The created or updated tasks, or the number of deleted
+            tasks. On validation failure, a 400 response whose `errors` list
+            holds the errors of each item in input order.
+        """
+        try:
+            if request.method == 'POST':
+                tasks = bulk_create_tasks(request.data, self.get_serializer_context())
+                serializer = self.get_serializer(tasks, many=True)
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            if request.method == 'PATCH':
+                tasks = bulk_update_tasks(request.data, self.get_serializer_context())
+                serializer = self.get_serializer(tasks, many=True)
+                return Response(serializer.data)
+            ids = request.data.get('ids') if isinstance(request.data, dict) else None
+            deleted = bulk_delete_tasks(ids)
+            return Response({'deleted': deleted})
+        except ValidationError as ve:
+            return Response(ve.detail, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Return the tasks created, updated or deleted since a sync token.
+
+        Call without `since` for a full sync, then pass the returned `next`
+        token as `since` to receive only what changed. While `more` is
+        true, call again straight away to fetch the rest.
+
+        Parameters:
+            self: The TaskViewSet instance.
+            request (Request): The HTTP request object. Supports the `since`
+                and `limit` query parameters.
+
+        Returns:
+            Response: The changed tasks, the ids of deleted tasks, `more` and
+            the `next` token. 400 for a malformed token and 410 for a token
+            older than the tombstone retention, which requires a full sync.
+
+        Example:
+            {
+                "changed": [{"id": 3, "title": "Task", ...}],
+                "deleted": [1, 2],
+                "more": false,
+                "next": "WyIyMDI0LTA3..."
+            }
+        """
+        try:
+            limit = int(request.query_params.get('limit', self.changes_limit))
+        except ValueError:
+            limit = self.changes_limit
+        limit = max(1, min(limit, self.max_changes_limit))
+        try:
+            changes = get_changes(request.query_params.get('since'), limit, self.get_queryset())
+        except ExpiredToken as e:
+            return Response({'detail': str(e)}, status=status.HTTP_410_GONE)
+        except InvalidToken as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        changes['changed'] = self.get_serializer(changes['changed'], many=True).data
+        return Response(changes)
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Return task counts by status, priority and category.
+
+        Counts are read from the incrementally maintained counter table, so
+        the cost does not depend on the number of tasks.
+
+        Parameters:
+            self: The TaskViewSet instance.
+            request (Request): The HTTP request object. `scope=all` returns
+                the counts for every task instead of the requesting user's.
+
+        Returns:
+            Response: The HTTP response containing the counts.
+
+        Example:
+            {
+                "status": {"In Progress": 3, "Completed": 1, "Overdue": 0},
+                "priority": {"Low": 1, "Medium": 2, "High": 1},
+                "category": {"Work": 4}
+            }
+        """
+        if request.query_params.get('scope') == SCOPE_ALL:
+            scope = SCOPE_ALL
+        else:
+            scope = user_scope(request.user.pk)
+        return Response(get_counts(scope))
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """
+        Return the response cache hit/miss counters of this worker process,
+        with the token authentication cache counters under `auth`.
+
+        Parameters:
+            self: The TaskViewSet instance.
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The HTTP response containing the cache counters.
+        """
+        return Response({**get_cache_stats(), 'auth': get_token_cache_stats()})
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+This module defines the asynchronous variants of the user directory views.
+
+They return the same payloads as UserViewSet.list and get_user_info, reading
+the directory with the async ORM and cache API. They replace the DRF routes
+when the ASYNC_API_VIEWS setting is enabled, and must be served through the
+ASGI application.
+"""
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+from .authentication import aauthenticate
+from .services import adirectory_response
+
+
+def unauthorized():
+    """Return the 401 response of an unauthenticated request."""
+    response = JsonResponse(
+        {'detail': 'Authentication credentials were not provided.'},
+        status=status.HTTP_401_UNAUTHORIZED,
+    )
+    response['WWW-Authenticate'] = 'Token'
+    return response
+
+
+@require_http_methods(['GET', 'HEAD'])
+async def user_list(request):
+    """
+    Return the id and name of every user, like UserViewSet.list.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The user list, or a 304 response when the request's
+        If-None-Match matches the directory ETag.
+    """
+    if await aauthenticate(request, allow_session=False) is None:
+        return unauthorized()
+    return await adirectory_response(request, lambda directory: [
+        {'id': pk, 'name': username} for pk, username in directory['users']
+    ])
+
+
+@require_http_methods(['GET', 'HEAD'])
+async def user_info(request):
+    """
+    Return the first 5 users and the total number of users, like
+    UserViewSet.get_user_info.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The user summary, or a 304 response when the request's
+        If-None-Match matches the directory ETag.
+    """
+    if await aauthenticate(request, allow_session=False) is None:
+        return unauthorized()
+    return await adirectory_response(request, lambda directory: {
+        'users': [{'id': pk, 'username': username} for pk, username in directory['users'][:5]],
+        'total': directory['total'],
+    })
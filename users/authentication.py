@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+This module defines the token authentication used by the API.
+
+Tokens are looked up in two cache layers before the database:
+
+    1. a per-process LRU holding recently used tokens for a few seconds
+       (TOKEN_AUTH_LOCAL_CACHE_SIZE, TOKEN_AUTH_LOCAL_CACHE_TIMEOUT);
+    2. the shared cache (Redis when REDIS_URL is set), holding tokens for
+       TOKEN_AUTH_CACHE_TIMEOUT seconds.
+
+Cache keys hold a SHA-256 hash of the token, never the token itself, and
+entries only hold the user fields authentication and permissions need
+(AUTH_FIELDS). No credential material, neither the token key nor the
+password hash, is written to the shared cache; the user is rebuilt from
+the entry with its other fields deferred. The signal handlers in
+users.signals drop cached tokens when a token is deleted or rotated and
+when its user is saved, e.g. deactivated. The shared cache is cleared
+immediately; other processes may still serve a token from their LRU
+until its short local timeout expires.
+
+Misses are read from the primary database, so a lagging replica never
+caches a stale user.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from task_manager.routers import read_from_primary
+
+KEY_PREFIX = 'auth:token'
+# The user fields cached with a token, in model order as from_db expects;
+# the others are loaded on access.
+AUTH_FIELDS = ('id', 'is_superuser', 'username', 'is_staff', 'is_active')
+
+
+def make_entry(user):
+    """Return the cache entry of a token's user."""
+    return tuple(getattr(user, field) for field in AUTH_FIELDS)
+
+
+def token_from_entry(key, entry):
+    """
+    Rebuild a token and its user from a cache entry.
+
+    Args:
+        key (str): The token key.
+        entry (tuple): The AUTH_FIELDS values of the user.
+
+    Returns:
+        Token: The token, with its user set.
+    """
+    user = User.from_db(router.db_for_read(User), AUTH_FIELDS, entry)
+    token = Token.from_db(router.db_for_read(Token), ['key', 'user_id'], [key, user.pk])
+    token.user = user
+    return token
+
+
+class TokenCache:
+    """
+    Two-level cache of authenticated tokens, keyed by the hashed token.
+    """
+
+    def __init__(self):
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    @staticmethod
+    def make_key(key):
+        """
+        Build the cache key of a token.
+
+        Args:
+            key (str): The token key.
+
+        Returns:
+            str: The cache key, holding a hash of the token.
+        """
+        return f'{KEY_PREFIX}:{hashlib.sha256(key.encode()).hexdigest()}'
+
+    @staticmethod
+    def get_shared_cache():
+        """Return the shared cache backend."""
+        return caches[getattr(settings, 'TOKEN_AUTH_CACHE_ALIAS', 'default')]
+
+    def get(self, key):
+        """
+        Return the cached token, or None on a miss.
+
+        Args:
+            key (str): The token key.
+
+        Returns:
+            Token: The token, with its user rebuilt from the cache entry.
+        """
+        cache_key = self.make_key(key)
+        entry = self._get_local(cache_key)
+        if entry is None:
+            entry = self.get_shared_cache().get(cache_key)
+            self._record_shared(cache_key, entry)
+        return None if entry is None else token_from_entry(key, entry)
+
+    async def aget(self, key):
+        """
+        Asynchronous variant of get.
+        """
+        cache_key = self.make_key(key)
+        entry = self._get_local(cache_key)
+        if entry is None:
+            entry = await self.get_shared_cache().aget(cache_key)
+            self._record_shared(cache_key, entry)
+        return None if entry is None else token_from_entry(key, entry)
+
+    def set(self, token):
+        """
+        Cache an authenticated token in both layers.
+
+        Args:
+            token (Token): The token, with its user loaded. Only the
+                AUTH_FIELDS of the user are cached.
+        """
+        cache_key = self.make_key(token.key)
+        entry = make_entry(token.user)
+        self._set_local(cache_key, entry)
+        self.get_shared_cache().set(cache_key, entry, self._shared_timeout())
+
+    async def aset(self, token):
+        """
+        Asynchronous variant of set.
+        """
+        cache_key = self.make_key(token.key)
+        entry = make_entry(token.user)
+        self._set_local(cache_key, entry)
+        await self.get_shared_cache().aset(cache_key, entry, self._shared_timeout())
+
+    def invalidate(self, keys):
+        """
+        Drop tokens from both layers.
+
+        Args:
+            keys (iterable): The token keys.
+        """
+        cache_keys = [self.make_key(key) for key in keys]
+        if not cache_keys:
+            return
+        with self._lock:
+            for cache_key in cache_keys:
+                self._local.pop(cache_key, None)
+        self.get_shared_cache().delete_many(cache_keys)
+
+    def clear_local(self):
+        """Empty the in-process layer."""
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        """
+        Return the hit/miss counters of this process.
+
+        Returns:
+            dict: The local and shared hits, the misses and the hit ratio.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        total = sum(stats.values())
+        hits = stats['local_hits'] + stats['shared_hits']
+        stats['hit_ratio'] = hits / total if total else 0.0
+        return stats
+
+    def _get_local(self, cache_key):
+        with self._lock:
+            entry = self._local.get(cache_key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._local.move_to_end(cache_key)
+                self._stats['local_hits'] += 1
+                return entry[1]
+            if entry is not None:
+                del self._local[cache_key]
+        return None
+
+    def _set_local(self, cache_key, entry):
+        timeout = getattr(settings, 'TOKEN_AUTH_LOCAL_CACHE_TIMEOUT', 10)
+        size = getattr(settings, 'TOKEN_AUTH_LOCAL_CACHE_SIZE', 10000)
+        with self._lock:
+            self._local[cache_key] = (time.monotonic() + timeout, entry)
+            self._local.move_to_end(cache_key)
+            while len(self._local) > size:
+                self._local.popitem(last=False)
+
+    def _record_shared(self, cache_key, entry):
+        if entry is not None:
+            self._set_local(cache_key, entry)
+        with self._lock:
+            self._stats['shared_hits' if entry is not None else 'misses'] += 1
+
+    @staticmethod
+    def _shared_timeout():
+        return getattr(settings, 'TOKEN_AUTH_CACHE_TIMEOUT', 300)
+
+
+token_cache = TokenCache()
+
+
+def get_token_cache_stats():
+    """
+    Return the token cache hit/miss counters of this process.
+
+    Returns:
+        dict: The local and shared hits, the misses and the hit ratio.
+    """
+    return token_cache.stats()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that serves repeated requests from the token cache
+    instead of joining authtoken_token and auth_user on every request.
+    """
+
+    def authenticate_credentials(self, key):
+        """
+        Return the user and token of a token key.
+
+        Args:
+            key (str): The token key from the Authorization header.
+
+        Returns:
+            tuple: The user and the token.
+
+        Raises:
+            AuthenticationFailed: If the token is unknown or its user inactive.
+        """
+        token = token_cache.get(key)
+        if token is None:
+            # The entry fills the shared cache, so it must not come from a
+            # replica that has not seen the latest write.
+            with read_from_primary():
+                user, token = super().authenticate_credentials(key)
+            token_cache.set(token)
+        elif not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return token.user, token
+
+
+async def aauthenticate(request, allow_session=True):
+    """
+    Authenticate a plain Django async view request.
+
+    Accepts the `Authorization: Token <key>` header used by the API, looked
+    up through the token cache, and falls back to the session so the board
+    page can open the event stream without exposing its token.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        allow_session (bool): Whether to fall back to the session. The async
+            API views are CSRF exempt like their DRF counterparts, so they
+            only accept tokens.
+
+    Returns:
+        User: The active authenticated user, or None.
+    """
+    keyword, _, key = request.headers.get('Authorization', '').partition(' ')
+    if keyword == 'Token' and key:
+        token = await token_cache.aget(key)
+        if token is None:
+            with read_from_primary():
+                token = await Token.objects.select_related('user').filter(key=key).afirst()
+            if token is not None and token.user.is_active:
+                await token_cache.aset(token)
+        user = token.user if token else None
+    elif allow_session:
+        user = await request.auser()
+    else:
+        user = None
+    if user is None or not user.is_authenticated or not user.is_active:
+        return None
+    return user
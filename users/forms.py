@@ -3,8 +3,9 @@
     This module defines the CustomUserCreationForm
     and CustomAuthenticationForm classes.
 """
-from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
+from django.contrib.auth.forms import AuthenticationForm, BaseUserCreationForm, UserCreationForm
 from django.forms import widgets
+from .passwords import hash_password
 
 
 class CustomUserCreationForm(UserCreationForm):
@@ -39,6 +40,26 @@ class CustomUserCreationForm(UserCreationForm):
                         '''
             })
 
+    def save(self, commit=True):
+        """
+        Save the new user, hashing the password in the hashing pool.
+
+        Args:
+            commit (bool): Whether to save the user to the database.
+
+        Returns:
+            User: The new user.
+        """
+        # Skip BaseUserCreationForm.save, which would hash the password again
+        # on the request thread.
+        user = super(BaseUserCreationForm, self).save(commit=False)
+        user.password = hash_password(self.cleaned_data['password1'])
+        if commit:
+            user.save()
+            if hasattr(self, 'save_m2m'):
+                self.save_m2m()
+        return user
+
 
 class CustomAuthenticationForm(AuthenticationForm):
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""This module defines the password hashers of the users app."""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 hasher whose cost is set by PASSWORD_PBKDF2_ITERATIONS.
+
+    It keeps Django's `pbkdf2_sha256` algorithm name, so existing hashes
+    still verify and are re-hashed at the configured cost on the next login.
+    Without the setting, Django's default number of iterations is used.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""This module defines the provision_users management command."""
+import json
+import time
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from task_manager.rows import FORMATS, guess_format, open_text, parse_rows
+from users.services import provision_users
+
+
+def concurrent_reject(number, row):
+    """Return the result of a row whose chunk failed on a concurrent insert."""
+    return {
+        'number': number,
+        'username': row.get('username') if isinstance(row, dict) else None,
+        'status': 'rejected',
+        'errors': {'non_field_errors': ['A username in this chunk was taken concurrently; retry the row.']},
+    }
+
+
+class Command(BaseCommand):
+    """
+    Create users, and their API tokens, from a CSV or NDJSON file of
+    usernames and passwords.
+    """
+    help = 'Create users and their tokens from a CSV or NDJSON file, hashing passwords in parallel.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The CSV or NDJSON file with username and password columns.')
+        parser.add_argument(
+            '--format', choices=FORMATS, default=None,
+            help='The file format (default: guessed from the extension).',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Rows checked, hashed and written per transaction.',
+        )
+        parser.add_argument(
+            '--results', default=None,
+            help='Write the result of every row, including the created tokens, to this NDJSON file.',
+        )
+        parser.add_argument(
+            '--rejects', default=None,
+            help='Write the rejected rows and their errors to this NDJSON file.',
+        )
+
+    def handle(self, *args, **options):
+        format = options['format'] or guess_format(options['path'])
+        if format is None:
+            raise CommandError('Cannot guess the file format; pass --format.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+
+        outputs = {
+            name: open(options[name], 'w') for name in ('results', 'rejects') if options[name]
+        }
+        created = rejected = 0
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as f:
+                rows = parse_rows(open_text(f), format)
+                while chunk := list(islice(rows, options['chunk_size'])):
+                    try:
+                        results = provision_users(chunk)
+                    except IntegrityError:
+                        # A username was taken concurrently; the chunk was
+                        # rolled back, so reject its rows and carry on.
+                        results = [concurrent_reject(number, row) for number, row in chunk]
+                    rejects = [result for result in results if result['status'] == 'rejected']
+                    created += len(results) - len(rejects)
+                    rejected += len(rejects)
+                    for name, lines in (('results', results), ('rejects', rejects)):
+                        if name in outputs:
+                            outputs[name].writelines(json.dumps(line) + '\n' for line in lines)
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+        finally:
+            for output in outputs.values():
+                output.close()
+        seconds = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} users, rejected {rejected} '
+            f'({created / seconds if seconds else 0:.0f} users/s).'
+        ))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+This module defines password hashing and validation off the request thread.
+
+PBKDF2 is CPU bound, so hashing on a request thread takes a core away from
+the task reads served by the same process. Passwords are instead hashed by
+a bounded pool of PASSWORD_HASHING_WORKERS processes, started on first use;
+the request thread only waits for the result. With 0 workers passwords are
+hashed inline.
+
+The password validators, including the common password list that
+CommonPasswordValidator reads from a gzip file, are loaded once at startup
+by preload_validators instead of on the first signup.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.contrib.auth.password_validation import (
+    CommonPasswordValidator, get_default_password_validators,
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def preload_validators():
+    """
+    Load the configured password validators, freezing the common password
+    list.
+
+    Returns:
+        list: The validators, as used by validate_password.
+    """
+    validators = get_default_password_validators()
+    for validator in validators:
+        if isinstance(validator, CommonPasswordValidator):
+            validator.passwords = frozenset(validator.passwords)
+    return validators
+
+
+def get_workers():
+    """Return the number of password hashing processes, 0 for inline."""
+    return getattr(settings, 'PASSWORD_HASHING_WORKERS', 0)
+
+
+def get_pool():
+    """
+    Return the password hashing pool, starting it on first use.
+
+    Workers are spawned rather than forked, so they do not inherit the
+    threads and connections of a running server. They only load the
+    settings and the hasher, not the apps, so no AppConfig.ready() side
+    effects run in them.
+
+    Returns:
+        ProcessPoolExecutor: The pool, or None when hashing is inline.
+    """
+    global _pool
+    workers = get_workers()
+    if not workers:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=get_hasher,
+            )
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the password hashing pool, if it was started."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def hash_passwords(passwords):
+    """
+    Hash passwords with the configured hasher, in parallel across the pool.
+
+    If the pool broke, e.g. a worker was killed, it is discarded and the
+    passwords are hashed inline.
+
+    Parameters:
+        passwords (list): The raw passwords.
+
+    Returns:
+        list: The encoded passwords, in input order.
+    """
+    pool = get_pool() if passwords else None
+    if pool is not None:
+        chunksize = max(1, len(passwords) // (get_workers() * 4))
+        try:
+            return list(pool.map(make_password, passwords, chunksize=chunksize))
+        except BrokenProcessPool:
+            shutdown_pool()
+    return [make_password(password) for password in passwords]
+
+
+def hash_password(password):
+    """Hash one password through the pool."""
+    return hash_passwords([password])[0]
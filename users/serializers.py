@@ -2,6 +2,7 @@
 """This module defines the UserSerializer class."""
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from .passwords import hash_password
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -16,6 +17,7 @@ class UserSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         A method that creates a new user instance with the given validated data.
+        The password is hashed in the password hashing pool.
 
         Args:
             validated_data (dict): A dictionary containing validated user data with 'username' and 'password' keys.
@@ -24,8 +26,8 @@ class UserSerializer(serializers.ModelSerializer):
             User: The newly created User instance with the provided username and password.
         """
         user = User(
-            username=validated_data['username']
+            username=validated_data['username'],
+            password=hash_password(validated_data['password']),
         )
-        user.set_password(validated_data['password'])
         user.save()
         return user
@@ -1,10 +1,25 @@
 #!/usr/bin/env python3
 """This module defines the helper functions for the user app."""
+import hashlib
+import json
+from django.conf import settings
+from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
+from task_manager.routers import read_from_primary
+from .passwords import hash_passwords
 from .serializers import UserSerializer
 
+DIRECTORY_CACHE_KEY = 'users:directory'
+
 
 def add_new_user(request):
     """
@@ -49,7 +64,207 @@ def add_new_user(request):
             return Response({'error': 'Password validation failed', 'details': error_messages}, status=status.HTTP_400_BAD_REQUEST)
 
         user = serializer.save()
+        invalidate_user_directory()
         return Response({'id': user.id, 'username': user.username}, status=status.HTTP_201_CREATED)
     else:
         error_details = {field: error[0].__str__() for field, error in serializer.errors.items()}
-        return Response({'error': 'Validation errors occurred', 'details': error_details}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response({'error': 'Validation errors occurred', 'details': error_details}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _bulk_batch_size():
+    """Return the number of rows written per bulk INSERT statement."""
+    return getattr(settings, 'USERS_BULK_BATCH_SIZE', 500)
+
+
+def _clean_username(value):
+    if not isinstance(value, str) or not value.strip():
+        return None, ['This field is required.']
+    username = value.strip()
+    try:
+        User._meta.get_field('username').run_validators(username)
+    except DjangoValidationError as e:
+        return username, list(e.messages)
+    return username, []
+
+
+def _validate_rows(rows):
+    """Validate rows like add_user, without querying the database."""
+    results, valid = [], []
+    for number, row in rows:
+        if not isinstance(row, dict):
+            results.append({'number': number, 'username': None, 'status': 'rejected',
+                            'errors': {'non_field_errors': ['Invalid row.']}})
+            continue
+        username, username_errors = _clean_username(row.get('username'))
+        errors = {'username': username_errors} if username_errors else {}
+        password = row.get('password')
+        if not isinstance(password, str) or not password:
+            errors['password'] = ['This field is required.']
+        elif not errors:
+            try:
+                validate_password(password, User(username=username))
+            except DjangoValidationError as e:
+                errors['password'] = list(e.messages)
+        result = {'number': number, 'username': username, 'status': 'rejected', 'errors': errors}
+        results.append(result)
+        if not errors:
+            valid.append((result, password))
+    return results, valid
+
+
+def provision_users(rows):
+    """
+    Create users and their API tokens from rows of `username` and
+    `password`.
+
+    Rows are validated like add_user, including the password validators.
+    Usernames are then checked against the existing users with one query
+    and against the earlier rows. The passwords of the remaining rows are
+    hashed in parallel by the password hashing pool, and the users and
+    their tokens are inserted with bulk_create in batches of
+    USERS_BULK_BATCH_SIZE, in one transaction.
+
+    Args:
+        rows (iterable): (row number, row dict or None) tuples, as from
+            task_manager.rows.parse_rows.
+
+    Returns:
+        list: One result per row, in input order: the row `number`, the
+        `username` and a `status`, 'created' with the user `id` and
+        `token`, or 'rejected' with the field `errors`.
+    """
+    results, valid = _validate_rows(rows)
+    usernames = {result['username'] for result, _ in valid}
+    taken = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    seen, accepted = set(), []
+    for result, password in valid:
+        username = result['username']
+        if username in taken:
+            result['errors'] = {'username': ['A user with that username already exists.']}
+        elif username in seen:
+            result['errors'] = {'username': ['A user with that username appears in an earlier row.']}
+        else:
+            seen.add(username)
+            accepted.append((result, password))
+
+    hashes = hash_passwords([password for _, password in accepted])
+    users = [User(username=result['username'], password=encoded) for (result, _), encoded in zip(accepted, hashes)]
+    batch_size = _bulk_batch_size()
+    with transaction.atomic():
+        users = User.objects.bulk_create(users, batch_size=batch_size)
+        tokens = Token.objects.bulk_create(
+            [Token(key=Token.generate_key(), user=user) for user in users], batch_size=batch_size,
+        )
+        if users:
+            invalidate_user_directory()
+    for (result, _), user, token in zip(accepted, users, tokens):
+        del result['errors']
+        result.update(status='created', id=user.pk, token=token.key)
+    return results
+
+
+def _directory_cache():
+    """Return the cache backend used for the user directory."""
+    return caches[getattr(settings, 'USERS_DIRECTORY_CACHE_ALIAS', 'default')]
+
+
+def get_user_directory():
+    """
+    Return the (id, username) pairs of every user, with their count and ETag.
+
+    Only the two columns are read, with a single query on the primary
+    database, and the result is cached until invalidate_user_directory is
+    called.
+
+    Returns:
+        dict: `users` (list of [id, username] pairs ordered by id), `total`
+        (int) and `etag` (str, a strong ETag of the directory).
+    """
+    cache = _directory_cache()
+    directory = cache.get(DIRECTORY_CACHE_KEY)
+    if directory is None:
+        with read_from_primary():
+            directory = _build_directory([list(row) for row in _directory_rows()])
+        cache.set(DIRECTORY_CACHE_KEY, directory, _directory_timeout())
+    return directory
+
+
+async def aget_user_directory():
+    """
+    Asynchronous variant of get_user_directory, reading with the async ORM.
+
+    Returns:
+        dict: `users`, `total` and `etag`, as returned by get_user_directory.
+    """
+    cache = _directory_cache()
+    directory = await cache.aget(DIRECTORY_CACHE_KEY)
+    if directory is None:
+        with read_from_primary():
+            directory = _build_directory([list(row) async for row in _directory_rows()])
+        await cache.aset(DIRECTORY_CACHE_KEY, directory, _directory_timeout())
+    return directory
+
+
+def _directory_rows():
+    return User.objects.order_by('id').values_list('id', 'username')
+
+
+def _directory_timeout():
+    return getattr(settings, 'USERS_DIRECTORY_CACHE_TIMEOUT', 3600)
+
+
+def _build_directory(users):
+    digest = hashlib.sha256(json.dumps(users).encode()).hexdigest()
+    return {'users': users, 'total': len(users), 'etag': f'"{digest}"'}
+
+
+def invalidate_user_directory():
+    """
+    Drop the cached user directory once the current transaction commits.
+    """
+    transaction.on_commit(lambda: _directory_cache().delete(DIRECTORY_CACHE_KEY))
+
+
+def directory_response(request, build_data):
+    """
+    Build a conditional response from the user directory.
+
+    Returns 304 Not Modified when the request's If-None-Match matches the
+    directory ETag, without building the payload.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        build_data (callable): Builds the response data from the directory.
+
+    Returns:
+        Response: The directory response, or a 304 response.
+    """
+    directory = get_user_directory()
+    response = get_conditional_response(request, etag=directory['etag'])
+    if response is None:
+        response = Response(build_data(directory), status=status.HTTP_200_OK)
+    response['ETag'] = directory['etag']
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+async def adirectory_response(request, build_data):
+    """
+    Asynchronous variant of directory_response for the async views.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        build_data (callable): Builds the response data from the directory.
+
+    Returns:
+        HttpResponse: The JSON directory response, or a 304 response.
+    """
+    directory = await aget_user_directory()
+    response = get_conditional_response(request, etag=directory['etag'])
+    if response is None:
+        response = HttpResponse(
+            JSONRenderer().render(build_data(directory)), content_type='application/json',
+        )
+    response['ETag'] = directory['etag']
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
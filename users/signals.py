@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""This module defines the signal handlers for the users app."""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import token_cache
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    """
+    Drop a rotated or deleted token from the token cache once the
+    transaction commits.
+    """
+    if kwargs.get('created'):
+        return
+    key = instance.key
+    transaction.on_commit(lambda: token_cache.invalidate([key]))
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Drop the cached tokens of a user whose account changed, e.g. was
+    deactivated, once the transaction commits.
+
+    Logins only update last_login and are ignored.
+    """
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    keys = list(Token.objects.filter(user=instance).values_list('key', flat=True))
+    if keys:
+        transaction.on_commit(lambda: token_cache.invalidate(keys))
@@ -4,9 +4,33 @@ from rest_framework.test import APIClient, APITestCase
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
 from rest_framework import status
+from django.core.cache import cache
+from django.test import AsyncRequestFactory
+from . import async_views
+from .authentication import CachedTokenAuthentication, aauthenticate, token_cache
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from functools import partial
+from task_manager.routers import ReplicaRouter, read_alias
+from .hashers import ConfigurablePBKDF2PasswordHasher
+from .passwords import hash_passwords, shutdown_pool
+from django.contrib.auth.hashers import check_password
+from .services import aget_user_directory, get_user_directory, provision_users
+from django.db import IntegrityError
+from django.contrib.auth.password_validation import CommonPasswordValidator, get_default_password_validators
+from django.core.management import call_command
+from django.test import override_settings
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+import json
+import tempfile
 
 class UserViewsTest(APITestCase):  # Using APITestCase for REST Framework views
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.signup_url = reverse('users:signup')
         self.login_url = reverse('users:login')
@@ -62,3 +86,206 @@ class UserViewsTest(APITestCase):  # Using APITestCase for REST Framework views
         response = self.client.post(reverse('users:user-create'), new_user_data, format='json')  
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data['username'], new_user_data['username'])
+
+    def test_user_directory_conditional_get(self):
+        """Test the user directory is cached, honours If-None-Match and is invalidated by signup."""
+        response = self.client.get(reverse('users:user-get-user-info'))
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('users:user-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.signup_url, {
+                'username': 'directoryuser',
+                'password1': 'Xk82!pqLmz',
+                'password2': 'Xk82!pqLmz',
+            })
+        response = self.client.get(reverse('users:user-get-user-info'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 2)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_token_authentication_cache(self):
+        """Test tokens are served from the cache and dropped on deactivation and deletion."""
+        url = reverse('users:user-get-user-info')
+        self.client.get(url)
+        before = token_cache.stats()
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        self.assertEqual(token_cache.stats()['local_hits'] - before['local_hits'], 1)
+
+        token_cache.clear_local()
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        self.assertEqual(token_cache.stats()['shared_hits'] - before['shared_hits'], 1)
+        entry = token_cache.get_shared_cache().get(token_cache.make_key(self.token.key))
+        self.assertNotIn(self.user.password, repr(entry))
+        self.assertNotIn(self.token.key, repr(entry))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = True
+            self.user.save()
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cache_misses_read_from_primary(self):
+        """Test directory and token cache misses read from default while a replica is selected."""
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        alias = read_alias.set('replica1')
+        try:
+            # Test cases run inside a transaction, which pins reads to default.
+            with mock.patch.object(connections['default'], 'in_atomic_block', False):
+                self.assertEqual(ReplicaRouter().db_for_read(User), 'replica1')
+                for fill in (
+                    get_user_directory,
+                    partial(CachedTokenAuthentication().authenticate_credentials, self.token.key),
+                    async_to_sync(aget_user_directory),
+                    partial(async_to_sync(aauthenticate), request),
+                ):
+                    cache.clear()
+                    token_cache.clear_local()
+                    with CaptureQueriesContext(connections['default']) as queries:
+                        fill()
+                    self.assertEqual(len(queries), 1)
+        finally:
+            read_alias.reset(alias)
+
+    async def test_async_user_directory(self):
+        """Test the async directory views return the DRF payloads and honour If-None-Match."""
+        factory = AsyncRequestFactory()
+        headers = {'Authorization': f'Token {self.token.key}'}
+        response = await async_views.user_list(factory.get('/api/v1/users/', headers=headers))
+        self.assertEqual(json.loads(response.content), [{'id': self.user.id, 'name': 'testuser'}])
+
+        response = await async_views.user_info(factory.get('/api/v1/users/get_user_info/', headers=headers))
+        self.assertEqual(json.loads(response.content)['total'], 1)
+        request = factory.get('/api/v1/users/', headers={**headers, 'If-None-Match': response['ETag']})
+        response = await async_views.user_list(request)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = await async_views.user_list(factory.get('/api/v1/users/'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000, PASSWORD_HASHING_WORKERS=0)
+class PasswordHashingTests(APITestCase):
+    """Tests of the password hashing pool, the validators and user provisioning."""
+
+    def test_configurable_hasher_and_preloaded_validators(self):
+        """Test new hashes use the configured cost and the common password list is frozen."""
+        encoded = hash_passwords(['Xk82!pqLmz'])[0]
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(check_password('Xk82!pqLmz', encoded))
+        common = [v for v in get_default_password_validators() if isinstance(v, CommonPasswordValidator)]
+        self.assertIsInstance(common[0].passwords, frozenset)
+
+    def test_signup_hashes_once(self):
+        """Test signup hashes the password once and logs the new user in without verifying it."""
+        encode = ConfigurablePBKDF2PasswordHasher.encode
+        with mock.patch.object(ConfigurablePBKDF2PasswordHasher, 'encode', autospec=True, side_effect=encode) as hashed:
+            response = self.client.post(reverse('users:signup'), {
+                'username': 'signedup', 'password1': 'Xk82!pqLmz', 'password2': 'Xk82!pqLmz',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(hashed.call_count, 1)
+        user = User.objects.get(username='signedup')
+        self.assertEqual(int(self.client.session['_auth_user_id']), user.pk)
+        self.assertTrue(user.check_password('Xk82!pqLmz'))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1)
+    def test_hashing_pool(self):
+        """Test passwords hashed by the process pool verify."""
+        try:
+            encoded = hash_passwords(['first-Pa55', 'second-Pa55'])
+        finally:
+            shutdown_pool()
+        self.assertTrue(check_password('first-Pa55', encoded[0]))
+        self.assertTrue(check_password('second-Pa55', encoded[1]))
+
+    def test_provision_users_command(self):
+        """Test the command creates the valid users and reports the others."""
+        User.objects.create_user(username='taken', password='Xk82!pqLmz')
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'users.csv'
+            rejects = Path(directory) / 'rejects.ndjson'
+            path.write_text(
+                'username,password\n'
+                'alice,Xk82!pqLmz\n'
+                'taken,Xk82!pqLmz\n'
+                'bob,123\n'
+                'alice,Zr71?mwTqa\n'
+            )
+            out = StringIO()
+            call_command('provision_users', str(path), rejects=str(rejects), stdout=out)
+            reported = [json.loads(line) for line in rejects.read_text().splitlines()]
+        self.assertIn('Created 1 users, rejected 3', out.getvalue())
+        self.assertTrue(User.objects.get(username='alice').check_password('Xk82!pqLmz'))
+        self.assertEqual([(r['number'], list(r['errors'])) for r in reported], [
+            (2, ['username']), (3, ['password']), (4, ['username']),
+        ])
+        self.assertTrue(Token.objects.filter(user__username='alice').exists())
+
+    def test_provision_users_command_conflict(self):
+        """Test a chunk failing on a concurrent insert is rejected and the run goes on."""
+        calls = []
+
+        def provision(rows):
+            calls.append(rows)
+            if len(calls) == 1:
+                raise IntegrityError('UNIQUE constraint failed: auth_user.username')
+            return provision_users(rows)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'users.ndjson'
+            rejects = Path(directory) / 'rejects.ndjson'
+            path.write_text('\n'.join(
+                json.dumps({'username': name, 'password': 'Xk82!pqLmz'}) for name in ('dan', 'eve', 'fay')
+            ))
+            out = StringIO()
+            with mock.patch('users.management.commands.provision_users.provision_users', side_effect=provision):
+                call_command('provision_users', str(path), chunk_size=2, rejects=str(rejects), stdout=out)
+            reported = [json.loads(line) for line in rejects.read_text().splitlines()]
+        self.assertIn('Created 1 users, rejected 2', out.getvalue())
+        self.assertEqual([(r['number'], r['username']) for r in reported], [(1, 'dan'), (2, 'eve')])
+        self.assertEqual(list(User.objects.filter(username__in=['dan', 'eve', 'fay']).values_list('username', flat=True)), ['fay'])
+
+    def test_bulk_provisioning_endpoint(self):
+        """Test the bulk endpoint creates users and tokens and reports every row."""
+        admin = User.objects.create_user(username='admin', password='Xk82!pqLmz', is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=admin).key)
+        items = [
+            {'username': 'carol', 'password': 'Xk82!pqLmz'},
+            {'username': 'admin', 'password': 'Xk82!pqLmz'},
+            {'username': 'carol', 'password': 'Zr71?mwTqa'},
+            {'username': 'dave', 'password': 'password'},
+            {'username': 'bad name!', 'password': 'Xk82!pqLmz'},
+            'not an object',
+            {'username': ' erin ', 'password': 'Zr71?mwTqa'},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('users:user-bulk'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['rejected']), (2, 5))
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], [
+            'created', 'rejected', 'rejected', 'rejected', 'rejected', 'rejected', 'created',
+        ])
+        self.assertEqual(results[6]['username'], 'erin')
+        self.assertEqual(Token.objects.get(user_id=results[0]['id']).key, results[0]['token'])
+        self.assertTrue(User.objects.get(username='erin').check_password('Zr71?mwTqa'))
+        self.assertEqual(list(results[3]['errors']), ['password'])
+
+        with override_settings(USERS_BULK_MAX_ITEMS=1):
+            response = self.client.post(reverse('users:user-bulk'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user__username='carol').key)
+        response = self.client.post(reverse('users:user-bulk'), items[:1], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,16 +1,26 @@
 #!/usr/bin/env python3
 """This module defines the urls for the users app."""
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import *
+from . import async_views
 
 
 app_name = 'users'
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
 
+# The async views take over the directory routes of the router when
+# ASYNC_API_VIEWS is enabled.
+async_urlpatterns = [
+    path('api/v1/users/', async_views.user_list, name='user-list-async'),
+    path('api/v1/users/get_user_info/', async_views.user_info, name='user-get-user-info-async'),
+]
+
 urlpatterns = [
     path('signup/', signup, name='signup'),
     path('login/', login_view, name='login'),
+    *(async_urlpatterns if settings.ASYNC_API_VIEWS else []),
     path('api/v1/', include(router.urls)),
 ]
\ No newline at end of file
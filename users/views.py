@@ -2,16 +2,17 @@
 """This module defines the UserViewSet class and signup and login logic."""
 from .forms import CustomUserCreationForm, CustomAuthenticationForm
 from rest_framework.authtoken.models import Token
-from django.contrib.auth.models import User
-from django.contrib.auth import login, authenticate
+from django.conf import settings
+from django.contrib.auth import login
 from django.shortcuts import render, redirect
-from rest_framework.response import Response
-from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.viewsets import ViewSet
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from django.db import IntegrityError
 from django.urls import reverse
-from .services import add_new_user
+from .services import add_new_user, directory_response, invalidate_user_directory, provision_users
 
 
 def signup(request):
@@ -45,9 +46,10 @@ def signup(request):
         form = CustomUserCreationForm(request.POST)
         if form.is_valid():
             user = form.save()
-            raw_password = form.cleaned_data.get('password1')
-            user = authenticate(username=user.username, password=raw_password)
-            login(request, user)
+            invalidate_user_directory()
+            # The user was just created with this password; logging in
+            # directly skips verifying it, which would hash it again.
+            login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
             token, created = Token.objects.get_or_create(user=user)
             redirect_url = reverse('tasks:index') + f'?token={token.key}'
             return redirect(redirect_url)
@@ -104,16 +106,21 @@ class UserViewSet(ViewSet):
         Returns:
             Response: A JSON response containing a list of dictionaries,
             where each dictionary represents a user and contains the user's id and name.
+            Served from the cached user directory, with a 304 response when the
+            request's If-None-Match matches its ETag.
         """
-        users = User.objects.all()
-        user_data = [{'id': user.id, 'name': user.username} for user in users]
-        return Response(user_data)
+        return directory_response(request, lambda directory: [
+            {'id': pk, 'name': username} for pk, username in directory['users']
+        ])
 
     @action(detail=False, methods=['get'])
     def get_user_info(self, request):
         """
         Retrieves information about the first 5 users and the total number of users.
 
+        Served from the cached user directory, with a 304 response when the
+        request's If-None-Match matches its ETag.
+
         Parameters:
             request (HttpRequest): The HTTP request object.
 
@@ -137,10 +144,10 @@ class UserViewSet(ViewSet):
                 "total": 10
             }
         """
-        users = User.objects.all()[:5]
-        user_info = [{'id': user.id, 'username': user.username} for user in users]
-        total_users = User.objects.count()
-        return Response({'users': user_info, 'total': total_users}, status=status.HTTP_200_OK)
+        return directory_response(request, lambda directory: {
+            'users': [{'id': pk, 'username': username} for pk, username in directory['users'][:5]],
+            'total': directory['total'],
+        })
     
     @action(detail=False, methods=['post'])
     def add_user(self, request):
@@ -158,4 +165,54 @@ class UserViewSet(ViewSet):
                 "status": "success"
             }
         """
-        return add_new_user(request)
\ No newline at end of file
+        return add_new_user(request)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk(self, request):
+        """
+        Creates many users, and their API tokens, in one request. Admin only.
+
+        Usernames are checked against existing users with one query,
+        passwords are hashed in parallel and the users and tokens are
+        inserted in bulk. Invalid rows are reported and do not prevent the
+        others from being created.
+
+        Parameters:
+            request (HttpRequest): The HTTP request object, with a list of
+                {"username", "password"} objects.
+
+        Returns:
+            Response: The number of created and rejected users and one
+            result per item, in input order. 400 if the body is not a list
+            or has more than USERS_BULK_MAX_ITEMS items, 409 if a username
+            was taken concurrently, in which case nothing was created.
+
+        Example:
+            {
+                "created": 1,
+                "rejected": 1,
+                "results": [
+                    {"number": 1, "username": "user1", "status": "created", "id": 7, "token": "..."},
+                    {"number": 2, "username": "user2", "status": "rejected",
+                     "errors": {"password": ["This password is too common."]}}
+                ]
+            }
+        """
+        max_items = getattr(settings, 'USERS_BULK_MAX_ITEMS', 10000)
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'error': 'Expected a list of users.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > max_items:
+            return Response(
+                {'error': f'Ensure there are no more than {max_items} users.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            results = provision_users(enumerate(items, start=1))
+        except IntegrityError:
+            return Response(
+                {'error': 'A username was taken concurrently; retry the request.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        created = sum(result['status'] == 'created' for result in results)
+        return Response({'created': created, 'rejected': len(results) - created, 'results': results})